@@ -0,0 +1,347 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Lucas Terriel
+#
+# Sequences to Alignment - STSAlign
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+#
+# Sequences to Alignment - STSAlign is the Levenshtein engine of the
+# Sequences to Similarity Tools (STS Tools) mini library implemented in
+# Kraken-Benchmark application, shared by the metrics and the visualizations :
+#
+# * dynamic programming matrix computed row by row with NumPy
+# * distance only with the bit-parallel algorithm of Myers (Hyyrö formulation)
+# * backtrace of the matrix for the colored versus texts
+#
+# the sequences are strings (characters) or lists of tokens (words).
+
+"""Sequences to Alignment - STSAlign
+
+Author : Lucas Terriel
+Date : 22/07/2020
+"""
+
+# built-in packages
+import math
+
+# external packages
+import numpy as np
+
+
+# above this number of cells, the alignments keep only checkpointed rows
+# of the matrix (about 100 Mo for the full matrix in int32)
+MAX_MATRIX_CELLS = 25000000
+
+
+def encode_sequences(sequence_1, sequence_2) -> tuple:
+    """encode two sequences of tokens (characters or words)
+    in arrays of integers with a shared vocabulary
+
+    Example
+    --------
+    >>> encode_sequences("Chien", "Chat")
+    (array([0, 1, 2, 3, 4]), array([0, 1, 5, 6]))
+
+    Args:
+        sequence_1 (str or list): first sequence
+        sequence_2 (str or list): second sequence
+
+    Returns:
+        tuple: arrays of the codes of the two sequences
+    """
+    vocabulary = {}
+    codes = [np.fromiter((vocabulary.setdefault(token, len(vocabulary)) for token in sequence),
+                         dtype=np.int64,
+                         count=len(sequence))
+             for sequence in (sequence_1, sequence_2)]
+    return codes[0], codes[1]
+
+
+def get_distance_dtype(size_1: int, size_2: int) -> type:
+    """returns the smallest signed integer type able to hold the
+    distances between two sequences (a distance is at most the
+    length of the longest sequence)
+
+    Args:
+        size_1 (int): length of the first sequence
+        size_2 (int): length of the second sequence
+
+    Returns:
+        type: numpy integer type
+    """
+    return np.int32 if max(size_1, size_2) < np.iinfo(np.int32).max else np.int64
+
+
+def next_levenshtein_row(previous_row: np.ndarray,
+                         code: int,
+                         codes_columns: np.ndarray,
+                         index_row: int,
+                         positions: np.ndarray) -> np.ndarray:
+    """compute a row of the dynamic programming matrix from the previous one
+
+    Note
+    ----
+    The substitutions and deletions only depend on the previous row, the
+    insertions run along the row : row[j] = min(tmp[j], row[j - 1] + 1) is
+    solved at once with a cumulative minimum on tmp[j] - j.
+
+    Args:
+        previous_row (np.ndarray): row index_row - 1 of the matrix
+        code (int): code of the token of the row
+        codes_columns (np.ndarray): codes of the sequence in columns
+        index_row (int): index of the row to compute
+        positions (np.ndarray): positions of the columns (0..len(columns))
+
+    Returns:
+        np.ndarray: row index_row of the matrix
+    """
+    row = np.empty_like(previous_row)
+    row[0] = index_row
+    np.minimum(previous_row[1:] + 1,
+               previous_row[:-1] + (codes_columns != code),
+               out=row[1:])
+    row -= positions
+    np.minimum.accumulate(row, out=row)
+    row += positions
+    return row
+
+
+def levenshtein_matrix(sequence_rows, sequence_columns) -> np.ndarray:
+    """compute the dynamic programming matrix of the Levenshtein distance,
+    row by row with NumPy
+
+    Example
+    --------
+    >>> levenshtein_matrix("Chien", "Chat")
+    [[0 1 2 3 4]
+     [1 0 1 2 3]
+     [2 1 0 1 2]
+     [3 2 1 1 2]
+     [4 3 2 2 2]
+     [5 4 3 3 3]]
+
+    Args:
+        sequence_rows (str or list): sequence in rows
+        sequence_columns (str or list): sequence in columns
+
+    Returns:
+        np.ndarray: matrix of shape (len(rows) + 1, len(columns) + 1),
+            the distance is the last value
+    """
+    codes_rows, codes_columns = encode_sequences(sequence_rows, sequence_columns)
+    dtype = get_distance_dtype(len(codes_rows), len(codes_columns))
+    positions = np.arange(len(codes_columns) + 1, dtype=dtype)
+    matrix = np.empty((len(codes_rows) + 1, len(codes_columns) + 1), dtype=dtype)
+    matrix[0] = positions
+    for index_row, code in enumerate(codes_rows, start=1):
+        matrix[index_row] = next_levenshtein_row(matrix[index_row - 1],
+                                                 code,
+                                                 codes_columns,
+                                                 index_row,
+                                                 positions)
+    return matrix
+
+
+def levenshtein_distance(reference, hypothesis) -> int:
+    """compute the Levenshtein distance only, with the bit-parallel algorithm
+    of Myers (Hyyrö formulation for the global edit distance). Each token of
+    the longest sequence updates the vertical deltas of a whole column
+    at once, packed in a Python integer of len(shortest sequence) bits.
+
+    Example
+    --------
+    >>> levenshtein_distance("Chien", "Chat")
+    3
+
+    Args:
+        reference (str or list): reference sequence
+        hypothesis (str or list): predicted sequence
+
+    Returns:
+        int: edit distance
+    """
+    if len(reference) < len(hypothesis):
+        reference, hypothesis = hypothesis, reference
+    size = len(hypothesis)
+    if not size:
+        return len(reference)
+
+    # bit masks of the positions of each token in the pattern (shortest sequence)
+    pattern_masks = {}
+    for position, token in enumerate(hypothesis):
+        pattern_masks[token] = pattern_masks.get(token, 0) | (1 << position)
+
+    full = (1 << size) - 1
+    last = 1 << (size - 1)
+    positive_vertical = full
+    negative_vertical = 0
+    score = size
+    for token in reference:
+        equal = pattern_masks.get(token, 0)
+        vertical = equal | negative_vertical
+        horizontal = (((equal & positive_vertical) + positive_vertical) ^ positive_vertical) | equal
+        positive_horizontal = negative_vertical | (~(horizontal | positive_vertical) & full)
+        negative_horizontal = positive_vertical & horizontal
+        if positive_horizontal & last:
+            score += 1
+        elif negative_horizontal & last:
+            score -= 1
+        positive_horizontal = ((positive_horizontal << 1) | 1) & full
+        negative_horizontal = (negative_horizontal << 1) & full
+        positive_vertical = negative_horizontal | (~(vertical | positive_horizontal) & full)
+        negative_vertical = positive_horizontal & vertical
+    return score
+
+
+def backtrace(matrix: np.ndarray) -> list:
+    """walk back the dynamic programming matrix from the last cell and
+    return the alignment operations in order
+
+    Note
+    ----
+    On ties, the diagonal is preferred, then the row step, then the column
+    step (tie-breaking of the colored versus texts). As the versus texts
+    always did, the walk stops as soon as one of the sequences is consumed.
+
+    Example
+    --------
+    >>> backtrace(levenshtein_matrix("Chien", "Chat"))
+    [('equal', 0, 0), ('equal', 1, 1), ('delete', 2, 2), ('replace', 3, 2),
+    ('replace', 4, 3)]
+
+    Args:
+        matrix (np.ndarray or CheckpointedMatrix): matrix of levenshtein_matrix()
+            or its checkpointed rows
+
+    Returns:
+        list: triples (operation, position in rows, position in columns) where
+            operation is 'equal', 'replace', 'delete' (token of the rows only)
+            or 'insert' (token of the columns only)
+    """
+    operations = []
+    index_row, index_column = matrix.shape[0] - 1, matrix.shape[1] - 1
+    while index_row > 0 and index_column > 0:
+        row = matrix[index_row]
+        previous_row = matrix[index_row - 1]
+        diagonal = previous_row[index_column - 1]
+        upper = row[index_column - 1]
+        left = previous_row[index_column]
+        if diagonal <= upper and diagonal <= left:
+            operation = 'equal' if row[index_column] == diagonal else 'replace'
+            index_row -= 1
+            index_column -= 1
+        elif left < diagonal and left <= upper:
+            operation = 'delete'
+            index_row -= 1
+        else:
+            operation = 'insert'
+            index_column -= 1
+        operations.append((operation, index_row, index_column))
+    return operations[::-1]
+
+
+class CheckpointedMatrix:
+    """Rows of the dynamic programming matrix of the Levenshtein distance
+    in O(sqrt(n) * m) memory instead of O(n * m), for the alignment
+    of long sequences (a whole register page).
+
+    A forward pass keeps one row every `interval` rows (checkpoints). A row
+    read by the backtrace is recomputed, with the rows of its block, from
+    the previous checkpoint : the two last blocks read are kept, as the
+    backtrace goes up the matrix. The rows are exactly those of
+    levenshtein_matrix(), so backtrace() returns the same operations.
+
+    Attributes:
+        shape (tuple) : shape of the full matrix
+        interval (int) : number of rows between two checkpoints
+        checkpoints (dict) : index of the row (key) and row (value)
+    """
+
+    def __init__(self, sequence_rows, sequence_columns, interval: int = None) -> None:
+        """Constructs the checkpoints with a forward pass on the matrix
+
+        Args:
+            sequence_rows (str or list): sequence in rows
+            sequence_columns (str or list): sequence in columns
+            interval (int, optional): number of rows between two checkpoints.
+                Defaults to the square root of the number of rows
+        """
+        self._codes_rows, self._codes_columns = encode_sequences(sequence_rows, sequence_columns)
+        dtype = get_distance_dtype(len(self._codes_rows), len(self._codes_columns))
+        self._positions = np.arange(len(self._codes_columns) + 1, dtype=dtype)
+        self.shape = (len(self._codes_rows) + 1, len(self._codes_columns) + 1)
+        self.interval = interval or max(1, int(math.sqrt(len(self._codes_rows))))
+        self.checkpoints = {0: self._positions.copy()}
+        self._blocks = {}
+
+        row = self.checkpoints[0]
+        for index_row, code in enumerate(self._codes_rows, start=1):
+            row = next_levenshtein_row(row, code, self._codes_columns, index_row, self._positions)
+            if index_row % self.interval == 0:
+                self.checkpoints[index_row] = row
+
+    def _get_block(self, start: int) -> list:
+        """recompute the rows of a block from its checkpoint
+
+        Args:
+            start (int): index of the checkpoint
+
+        Returns:
+            list: rows start to start + interval - 1 (or the last row)
+        """
+        if start not in self._blocks:
+            if len(self._blocks) == 2:
+                # forget the block the farthest from the backtrace
+                del self._blocks[max(self._blocks)]
+            rows = [self.checkpoints[start]]
+            for index_row in range(start + 1, min(start + self.interval, self.shape[0])):
+                rows.append(next_levenshtein_row(rows[-1],
+                                                 self._codes_rows[index_row - 1],
+                                                 self._codes_columns,
+                                                 index_row,
+                                                 self._positions))
+            self._blocks[start] = rows
+        return self._blocks[start]
+
+    def __getitem__(self, index_row: int) -> np.ndarray:
+        """returns a row of the matrix
+
+        Args:
+            index_row (int): index of the row
+
+        Returns:
+            np.ndarray: row of the matrix
+        """
+        start = index_row - index_row % self.interval
+        return self._get_block(start)[index_row - start]
+
+
+def alignment_operations(sequence_rows,
+                         sequence_columns,
+                         max_cells: int = MAX_MATRIX_CELLS) -> list:
+    """align two sequences, see backtrace(). The full matrix is used for
+    small sequences, the checkpointed rows above max_cells cells.
+
+    Args:
+        sequence_rows (str or list): sequence in rows
+        sequence_columns (str or list): sequence in columns
+        max_cells (int, optional): maximum number of cells of the full matrix
+
+    Returns:
+        list: triples (operation, position in rows, position in columns)
+    """
+    if (len(sequence_rows) + 1) * (len(sequence_columns) + 1) <= max_cells:
+        return backtrace(levenshtein_matrix(sequence_rows, sequence_columns))
+    return backtrace(CheckpointedMatrix(sequence_rows, sequence_columns))
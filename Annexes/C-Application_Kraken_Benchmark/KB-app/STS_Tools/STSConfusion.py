@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Lucas Terriel
+#
+# Sequences to Confusion - STSConfusion
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+#
+# Sequences to Confusion - STSConfusion is the characters confusion
+# matrix of the Sequences to Similarity Tools (STS Tools) mini library
+# implemented in Kraken-Benchmark application :
+#
+# * editops() operations converted to code points with NumPy
+# * dense confusion matrix over the alphabet of the corpus, fed page by page
+# * merge of the matrices of several processes
+# * top-k confusions without going back to the texts
+#
+# the empty character (ε) stands for the missing side of an insertion
+# (reference) or of a deletion (prediction).
+
+"""Sequences to Confusion - STSConfusion
+
+Author : Lucas Terriel
+Date : 22/07/2020
+"""
+
+# external packages
+from Levenshtein import editops
+import numpy as np
+
+# local packages
+from STS_Tools.STSTokenize import characters_codes
+
+
+# empty character of the insertions and deletions
+EPSILON = 'ε'
+EPSILON_CODE = -1
+
+
+def editops_codes(edit_operations: list,
+                  reference_codes: np.ndarray,
+                  prediction_codes: np.ndarray) -> tuple:
+    """convert the editops() operations in code points of the characters,
+    EPSILON_CODE for the missing side of the insertions and deletions
+
+    Example
+    --------
+    >>> ref, pred = "chat", "chant"
+    >>> editops_codes(editops(ref, pred), characters_codes(ref), characters_codes(pred))
+    (array([-1]), array([110]))
+
+    Args:
+        edit_operations (list): triples (operation, spos, dpos) of editops()
+        reference_codes (np.ndarray): code points of the reference (see characters_codes())
+        prediction_codes (np.ndarray): code points of the prediction
+
+    Returns:
+        tuple: code points of the reference characters and of the
+            predicted characters, one by operation
+    """
+    if not edit_operations:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    operations, source_positions, destination_positions = zip(*edit_operations)
+    operations = np.array(operations)
+    # a position can be the length of the sequence (insertion or deletion
+    # at the end) : the last code is the empty character
+    source = np.append(reference_codes.astype(np.int64), EPSILON_CODE)[list(source_positions)]
+    destination = np.append(prediction_codes.astype(np.int64),
+                            EPSILON_CODE)[list(destination_positions)]
+    source[operations == 'insert'] = EPSILON_CODE
+    destination[operations == 'delete'] = EPSILON_CODE
+    return source, destination
+
+
+class ConfusionAccumulator:
+    """Confusion matrix of the characters of a corpus, the reference
+    characters in rows and the predicted characters in columns.
+
+    The alphabet grows with the pages : each new code point gets the
+    next index, the matrix doubles its size when it is full. The empty
+    character (ε) has the index 0.
+
+    Example
+    --------
+    >>> confusion = ConfusionAccumulator()
+    >>> confusion.add("Oh le beau bateau", "Oh le belle avion")
+    >>> confusion.top_k(2)
+    [(('insert', 'ε', 'l'), 1), (('replace', 'a', 'l'), 1)]
+
+    Attributes:
+        alphabet (dict) : code point (key) and index in the matrix (value)
+        matrix (np.ndarray) : number of confusions, square matrix of the
+            capacity of the alphabet
+        reference_counts (np.ndarray) : number of each reference character
+        pages (int) : number of pages added
+    """
+
+    def __init__(self, capacity: int = 128) -> None:
+        """Constructs an empty confusion matrix
+
+        Args:
+            capacity (int, optional): initial size of the alphabet. Defaults to 128
+        """
+        self.alphabet = {EPSILON_CODE: 0}
+        self.matrix = np.zeros((capacity, capacity), dtype=np.int64)
+        self.reference_counts = np.zeros(capacity, dtype=np.int64)
+        self.pages = 0
+
+    def __len__(self) -> int:
+        return len(self.alphabet)
+
+    def _grow(self, size: int) -> None:
+        """increase the capacity of the matrix to hold size characters
+
+        Args:
+            size (int): number of characters of the alphabet
+        """
+        capacity = len(self.reference_counts)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        matrix = np.zeros((capacity, capacity), dtype=np.int64)
+        matrix[:len(self.matrix), :len(self.matrix)] = self.matrix
+        reference_counts = np.zeros(capacity, dtype=np.int64)
+        reference_counts[:len(self.reference_counts)] = self.reference_counts
+        self.matrix, self.reference_counts = matrix, reference_counts
+
+    def indexes(self, codes: np.ndarray) -> np.ndarray:
+        """indexes of code points in the matrix, the new code
+        points are added to the alphabet
+
+        Args:
+            codes (np.ndarray): code points
+
+        Returns:
+            np.ndarray: indexes in the matrix
+        """
+        unique, inverse = np.unique(codes, return_inverse=True)
+        for code in unique.tolist():
+            if code not in self.alphabet:
+                self.alphabet[code] = len(self.alphabet)
+        self._grow(len(self.alphabet))
+        lookup = np.array([self.alphabet[code] for code in unique.tolist()], dtype=np.int64)
+        return lookup[inverse.reshape(-1)]
+
+    def add_codes(self, reference_codes: np.ndarray, prediction_codes: np.ndarray) -> None:
+        """add pairs of confused code points, see editops_codes()
+
+        Args:
+            reference_codes (np.ndarray): code points of the reference characters
+            prediction_codes (np.ndarray): code points of the predicted characters
+        """
+        if not len(reference_codes):
+            return
+        indexes = self.indexes(np.concatenate((reference_codes, prediction_codes)))
+        np.add.at(self.matrix, (indexes[:len(reference_codes)], indexes[len(reference_codes):]), 1)
+
+    def add(self, reference: str, prediction: str, edit_operations: list = None) -> None:
+        """add the confusions of a page
+
+        Args:
+            reference (str): reference sequence
+            prediction (str): prediction sequence
+            edit_operations (list, optional): editops(reference, prediction)
+                if already computed
+        """
+        if edit_operations is None:
+            edit_operations = editops(reference, prediction)
+        reference_codes = characters_codes(reference)
+        prediction_codes = characters_codes(prediction)
+        if len(reference_codes):
+            indexes = self.indexes(reference_codes)
+            self.reference_counts += np.bincount(indexes, minlength=len(self.reference_counts))
+        self.add_codes(*editops_codes(edit_operations, reference_codes, prediction_codes))
+        self.pages += 1
+
+    def merge(self, other: 'ConfusionAccumulator') -> 'ConfusionAccumulator':
+        """add the confusions of another accumulator (of a worker process)
+
+        Args:
+            other (ConfusionAccumulator): accumulator to merge
+
+        Returns:
+            ConfusionAccumulator: this accumulator
+        """
+        codes = np.array(sorted(other.alphabet, key=other.alphabet.get), dtype=np.int64)
+        mapping = self.indexes(codes)
+        size = len(codes)
+        self.matrix[np.ix_(mapping, mapping)] += other.matrix[:size, :size]
+        self.reference_counts[mapping] += other.reference_counts[:size]
+        self.pages += other.pages
+        return self
+
+    def characters(self) -> list:
+        """characters of the alphabet in order of the indexes
+
+        Returns:
+            list: characters, EPSILON first
+        """
+        return [EPSILON if code == EPSILON_CODE else chr(code)
+                for code in sorted(self.alphabet, key=self.alphabet.get)]
+
+    def top_k(self, k: int = 10) -> list:
+        """most frequent confusions, in the format of
+        VisualSynTS.pair_char_errors_max_occurences
+
+        Args:
+            k (int, optional): number of confusions. Defaults to 10
+
+        Returns:
+            list: ((operation, reference char, predicted char), occurences),
+                by decreasing occurences, the ties by index of the reference
+                character then of the predicted character in the alphabet
+                (see characters() : ε first, then the characters in the order
+                of the pages, by code point within a page)
+        """
+        if k <= 0:
+            return []
+        size = len(self.alphabet)
+        counts = self.matrix[:size, :size].ravel()
+        candidates = np.flatnonzero(counts)
+        # full sort of the confusions (at most the alphabet squared) : the
+        # ties at the k-th rank are always broken the same way
+        candidates = candidates[np.lexsort((candidates, -counts[candidates]))][:k]
+        characters = self.characters()
+        pairs = []
+        for flat in candidates.tolist():
+            row, column = divmod(flat, size)
+            # the operation comes from the indexes and not from the characters :
+            # a real ε of the texts is not the placeholder of index 0
+            if row == 0:
+                operation = 'insert'
+            elif column == 0:
+                operation = 'delete'
+            else:
+                operation = 'replace'
+            source, destination = characters[row], characters[column]
+            pairs.append(((operation, source, destination), int(counts[flat])))
+        return pairs
+
+    def error_rates(self) -> dict:
+        """share of the reference characters not recognized (replaced
+        or deleted), by character
+
+        Returns:
+            dict: character (key) and error rate (value)
+        """
+        size = len(self.alphabet)
+        errors = self.matrix[:size, :size].sum(axis=1)
+        characters = self.characters()
+        return {characters[index]: errors[index] / self.reference_counts[index]
+                for index in np.flatnonzero(self.reference_counts[:size]).tolist()}
@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Lucas Terriel
+#
+# Sequences to Corpus - STSCorpus
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+#
+# Sequences to Corpus - STSCorpus is the aggregation layer of the
+# Sequences to Similarity Tools (STS Tools) mini library implemented in
+# Kraken-Benchmark application : corpus-level CER and WER from the
+# per-page edit counts, kept in NumPy arrays.
+#
+# * micro average : total edits / total reference characters (or words)
+# * macro average : mean of the per-page rates
+# * percentiles of the per-page rates
+# * bootstrap confidence intervals (pages resampled with replacement)
+
+"""Sequences to Corpus - STSCorpus
+
+Author : Lucas Terriel
+Date : 22/07/2020
+"""
+
+# external packages
+import numpy as np
+
+
+# levels of the error rates : characters (CER) and words (WER)
+LEVELS = ('char', 'word')
+
+# maximum number of values drawn at once by the bootstrap
+BOOTSTRAP_CHUNK_SIZE = 10000000
+
+# number of resamples of the confidence intervals shown in the report
+BOOTSTRAP_RESAMPLES = 1000
+
+
+class CorpusMetrics:
+    """Corpus-level error rates of a list of pages.
+
+    Note
+    ----
+    The pages without reference tokens are left out of the per-page
+    rates (macro average, percentiles), their edits still count in
+    the micro average.
+
+    Example
+    --------
+    >>> corpus = CorpusMetrics([2, 0], [10, 30], [1, 0], [2, 6])
+    >>> corpus.micro('char'), corpus.macro('char')
+    (0.05, 0.1)
+
+    Attributes:
+        edits (dict) : level (key) and edit distance of each page (value)
+        totals (dict) : level (key) and number of reference tokens
+            of each page (value)
+        intervals (dict) : confidence intervals already computed, by
+            parameters of bootstrap_ci() (key)
+    """
+
+    def __init__(self, char_edits, char_totals, word_edits, word_totals) -> None:
+        """Constructs the arrays of edit counts
+
+        Args:
+            char_edits (list): characters edit distance of each page
+            char_totals (list): number of reference characters of each page
+            word_edits (list): words edit distance of each page
+            word_totals (list): number of reference words of each page
+        """
+        self.edits = {'char': np.asarray(char_edits, dtype=np.int64),
+                      'word': np.asarray(word_edits, dtype=np.int64)}
+        self.totals = {'char': np.asarray(char_totals, dtype=np.int64),
+                       'word': np.asarray(word_totals, dtype=np.int64)}
+        self.intervals = {}
+
+    @classmethod
+    def from_metrics(cls, list_statistics: list) -> 'CorpusMetrics':
+        """build the corpus from the metrics objects of the pages
+
+        Args:
+            list_statistics (list): list contains TranscriptionMetricsTools
+                or TranscriptionMetricsRecord objects
+
+        Returns:
+            CorpusMetrics: corpus of the pages
+        """
+        return cls([item.distance_int_char for item in list_statistics],
+                   [item.reference_total_char for item in list_statistics],
+                   [item.distance_int_word for item in list_statistics],
+                   [item.reference_total_word for item in list_statistics])
+
+    def __len__(self) -> int:
+        return len(self.edits['char'])
+
+    def micro(self, level: str = 'char') -> float:
+        """micro average : total edits / total reference tokens
+
+        Args:
+            level (str, optional): 'char' (CER) or 'word' (WER). Defaults to 'char'
+
+        Returns:
+            float: error rate, nan without reference tokens
+        """
+        total = self.totals[level].sum()
+        return float(self.edits[level].sum() / total) if total else float('nan')
+
+    def page_rates(self, level: str = 'char') -> np.ndarray:
+        """error rate of each page with reference tokens
+
+        Args:
+            level (str, optional): 'char' (CER) or 'word' (WER). Defaults to 'char'
+
+        Returns:
+            np.ndarray: per-page error rates
+        """
+        totals = self.totals[level]
+        mask = totals > 0
+        return self.edits[level][mask] / totals[mask]
+
+    def macro(self, level: str = 'char') -> float:
+        """macro average : mean of the per-page error rates
+
+        Args:
+            level (str, optional): 'char' (CER) or 'word' (WER). Defaults to 'char'
+
+        Returns:
+            float: error rate, nan without page
+        """
+        rates = self.page_rates(level)
+        return float(rates.mean()) if len(rates) else float('nan')
+
+    def percentiles(self, level: str = 'char', ranks: tuple = (5, 25, 50, 75, 95)) -> dict:
+        """distribution of the per-page error rates
+
+        Args:
+            level (str, optional): 'char' (CER) or 'word' (WER). Defaults to 'char'
+            ranks (tuple, optional): percentiles to compute, between 0 and 100
+
+        Returns:
+            dict: percentile (key) and error rate (value)
+        """
+        rates = self.page_rates(level)
+        if not len(rates):
+            return {rank: float('nan') for rank in ranks}
+        return dict(zip(ranks, np.percentile(rates, ranks).tolist()))
+
+    def bootstrap_ci(self,
+                     level: str = 'char',
+                     average: str = 'micro',
+                     confidence: float = 0.95,
+                     resamples: int = 1000,
+                     seed: int = 0) -> tuple:
+        """percentile bootstrap confidence interval of an average : the
+        pages are resampled with replacement, the resamples are drawn
+        by chunks to bound the memory on large corpora. Each interval
+        is computed once (see intervals)
+
+        Args:
+            level (str, optional): 'char' (CER) or 'word' (WER). Defaults to 'char'
+            average (str, optional): 'micro' or 'macro'. Defaults to 'micro'
+            confidence (float, optional): confidence level. Defaults to 0.95
+            resamples (int, optional): number of resamples. Defaults to 1000
+            seed (int, optional): seed of the random generator. Defaults to 0
+
+        Returns:
+            tuple: lower and upper bounds of the interval, nan without page
+        """
+        key = (level, average, confidence, resamples, seed)
+        if key not in self.intervals:
+            self.intervals[key] = self._bootstrap_ci(*key)
+        return self.intervals[key]
+
+    def _bootstrap_ci(self, level: str, average: str, confidence: float,
+                      resamples: int, seed: int) -> tuple:
+        """computes the interval of bootstrap_ci()"""
+        if average == 'micro':
+            numerators, denominators = self.edits[level], self.totals[level]
+        else:
+            numerators = self.page_rates(level)
+            denominators = np.ones_like(numerators)
+        size = len(numerators)
+        if not size:
+            return float('nan'), float('nan')
+
+        generator = np.random.default_rng(seed)
+        chunk = max(1, BOOTSTRAP_CHUNK_SIZE // size)
+        statistics = []
+        for start in range(0, resamples, chunk):
+            indexes = generator.integers(0, size, size=(min(chunk, resamples - start), size))
+            sums = denominators[indexes].sum(axis=1)
+            statistics.append(numerators[indexes].sum(axis=1) / np.where(sums, sums, 1))
+        alpha = (1 - confidence) / 2 * 100
+        low, high = np.percentile(np.concatenate(statistics), (alpha, 100 - alpha))
+        return float(low), float(high)
+
+    def summary(self, confidence: float = 0.95, resamples: int = 0) -> dict:
+        """corpus-level metrics in percent, for the report and exports.
+        The bootstrap confidence intervals are opt-in (resamples), the
+        averages and percentiles alone take a few milliseconds
+
+        Args:
+            confidence (float, optional): confidence level. Defaults to 0.95
+            resamples (int, optional): number of resamples of the confidence
+                intervals, 0 for no interval (None). Defaults to 0
+
+        Returns:
+            dict: level (key) and micro and macro averages with their
+                confidence intervals, and percentiles of the per-page
+                rates (value), plus the number of pages
+        """
+        def interval(level: str, average: str) -> tuple:
+            if not resamples:
+                return None
+            return tuple(100 * bound for bound in
+                         self.bootstrap_ci(level, average, confidence, resamples))
+
+        result = {'pages': len(self), 'confidence': confidence}
+        for level in LEVELS:
+            result[level] = {
+                'micro': 100 * self.micro(level),
+                'micro_ci': interval(level, 'micro'),
+                'macro': 100 * self.macro(level),
+                'macro_ci': interval(level, 'macro'),
+                'percentiles': {rank: 100 * value
+                                for rank, value in self.percentiles(level).items()}}
+        return result
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2020 Lucas Terriel
+#
+# Sequences to Tokens - STSTokenize
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+#
+# Sequences to Tokens - STSTokenize is the tokenizer of the
+# Sequences to Similarity Tools (STS Tools) mini library implemented in
+# Kraken-Benchmark application, used in the hot path of the metrics :
+#
+# * clean text steps with a translation table built once
+# * words and characters cutouts with a precompiled pattern
+# * code points of the characters in a NumPy array
+#
+# the cutouts are the same as NLTK regexp_tokenize() with gaps.
+
+"""Sequences to Tokens - STSTokenize
+
+Author : Lucas Terriel
+Date : 22/07/2020
+"""
+
+# built-in packages
+import re
+
+# external packages
+import numpy as np
+
+
+# numbers and punctuation removed by the clean text option
+PUNCTUATION_NUMBERS = '!"#$%&()*+,-—./:;<=>«»?@[\\]^_{|}~\'`’' + '0123456789'
+
+# clean text steps in one table : new lines removed, carriage returns
+# replaced with a space, numbers and punctuation removed
+CLEAN_TEXT_TABLE = str.maketrans({**dict.fromkeys(PUNCTUATION_NUMBERS + "\n"), "\r": " "})
+
+# words separators, same flags as nltk.tokenize.RegexpTokenizer
+WORDS_SEPARATORS = re.compile(r'\W', re.UNICODE | re.MULTILINE | re.DOTALL)
+
+
+def clean_text(text: str) -> str:
+    """option to performs a few cleanning steps to remove non-alphabetic characters
+    use this one for syntaxic similarity metrics if the project necessites
+    remove punctuation and space for :
+
+    # TODO(Lucas): to improve and distinguish numbers and punctuation
+
+    - WER
+    - CER
+
+    Example
+    --------
+    >>> sentence = "On dit en 1879 que la puanteur...de son souffle, est moribonde"
+    >>> clean_text(sentence)
+    On dit en  que la puanteurde son souffle est moribonde
+
+    Args:
+        text (str): text to clean
+
+    Returns:
+        str: clean text
+    """
+    return text.translate(CLEAN_TEXT_TABLE)
+
+
+def tokenize_words(sentence: str) -> list:
+    """words cutouts on the non-alphanumeric characters,
+    same as regexp_tokenize(sentence, pattern='\\W', gaps=True)
+
+    Example
+    --------
+    >>> tokenize_words('Un homme à la mer !')
+    ['Un', 'homme', 'à', 'la', 'mer']
+
+    Args:
+        sentence (str): sentence to tokenize
+
+    Returns:
+        list: words tokens
+    """
+    return [token for token in WORDS_SEPARATORS.split(sentence) if token]
+
+
+def tokenize_characters(sentence: str) -> list:
+    """characters cutouts (with space),
+    same as regexp_tokenize(sentence, pattern='', gaps=True)
+
+    Example
+    --------
+    >>> tokenize_characters('la mer')
+    ['l', 'a', ' ', 'm', 'e', 'r']
+
+    Args:
+        sentence (str): sentence to tokenize
+
+    Returns:
+        list: characters tokens
+    """
+    return list(sentence)
+
+
+def characters_codes(sentence: str) -> np.ndarray:
+    """code points of the characters of a sentence, without any
+    Python object by character (4 bytes by character)
+
+    Example
+    --------
+    >>> characters_codes('la mer')
+    array([108,  97,  32, 109, 101, 114], dtype=uint32)
+
+    Args:
+        sentence (str): sentence to encode
+
+    Returns:
+        np.ndarray: code points of the characters
+    """
+    return np.frombuffer(sentence.encode('utf-32-le'), dtype='<u4')
+
+
+def tokenizer(sentence: str, *args: bool) -> tuple:
+    """another regex-based tokenizer works in conjunction with the text
+    clean_text() function. returns tokens characters based and words based.
+
+    Example
+    --------
+    >>> sentence = 'Un homme à la mer !'
+    >>> tokenizer(sentence)
+    (['Un', 'homme', 'à', 'la', 'mer'],
+    ['U', 'n', ' ', 'h', 'o', 'm', 'm', 'e', ' ', 'à', ' ', 'l', 'a', ' ', 'm', 'e', 'r', ' ', '!'])
+
+    Args:
+        sentence (str) : sentence to tokenize
+        *args (bool) : if user activate clean_text() function option
+
+    Returns:
+        list: words-tokens based
+        list: character-tokens based
+    """
+    if args:
+        # the sentence is cleaned once for both cutouts
+        sentence = clean_text(sentence)
+    return tokenize_words(sentence), tokenize_characters(sentence)
@@ -25,12 +25,15 @@
 #
 # TODO(Lucas): in progress...
 
+import functools
 import math
-import matplotlib.pyplot as plt
-from matplotlib import patches
-from matplotlib.collections import PatchCollection
-from matplotlib.patches import Rectangle
-import pandas as pd
+import types
+
+import numpy as np
+
+from STS_Tools.STSTokenize import characters_codes
+
+# matplotlib and pandas are imported by the figures and the HTML table only
 
 
 class SetDictionaryCharWeightPosition:
@@ -103,14 +106,18 @@ class SetDictionaryCharWeightPosition:
 
         - weight_punctuation -> 0.5
         - weight_acute -> 0.5
-        - weight_capitalize -> 0.1
+        - weight_capitalize -> 0.5
         - weight_space -> 0
 
         ****************************************
 
     """
 
-    def __init__(self) -> None:
+    def __init__(self,
+                 weight_punctuation: float = 0.5,
+                 weight_acute: float = 0.5,
+                 weight_capitalize: float = 0.5,
+                 weight_space: float = 0) -> None:
         # Set basics chars series
         self.char_alpha_serie = list("abcdefghijklmnopqrstuvwxyz")
         self.num_serie = list("0123456789")
@@ -141,16 +148,21 @@ class SetDictionaryCharWeightPosition:
 
         # Set weights transformation
 
-        self.weight_punctuation = 0.5
-        self.weight_acute = 0.5
-        self.weight_capitalize = 0.5
-        self.weight_space = 0
+        self.weight_punctuation = weight_punctuation
+        self.weight_acute = weight_acute
+        self.weight_capitalize = weight_capitalize
+        self.weight_space = weight_space
 
         # list contains all chars (this order is very important, determine the position and char areas
         # for plot signals in next steps - see bellow)
 
         self.all_char_series = self.char_alpha_serie + self.interlacted_serie + self.num_serie + self.punct_serie + self.space_serie
 
+    @property
+    def weights(self) -> tuple:
+        """weights of transformations, key of the shared tables"""
+        return self.weight_punctuation, self.weight_acute, self.weight_capitalize, self.weight_space
+
     def _get_dict_char_weight(self) -> dict:
         """generates a dictionary with the predefined character set
         in __init__method as a key and its weight position in value.
@@ -172,12 +184,9 @@ class SetDictionaryCharWeightPosition:
             :weight_capitalize: weight for preset capitalization
             :type weight_capitalize: int
             """
-            i = 0
-            while i < len(acutes_char):
-                for char_acute in acutes_char:
-                    position_weight_char[char_acute] = position + weight_acute
-                    position_weight_char[char_acute.upper()] = position + weight_acute + weight_capitalize
-                    i += 1
+            for char_acute in acutes_char:
+                position_weight_char[char_acute] = position + weight_acute
+                position_weight_char[char_acute.upper()] = position + weight_acute + weight_capitalize
 
         position = 1
         # creation of an empty reference dictionary to accommodate a character and its weight
@@ -236,7 +245,64 @@ class SetDictionaryCharWeightPosition:
 
 # on créé la fonction pour crypter la sequence signal en dehors de la classe
 
-def encrypt_steps_sentence_to_signal(sequence: str, dictionnary_char_position_weight: dict) -> list:
+def get_weight_table(dictionnary_char_position_weight: dict) -> np.ndarray:
+    """compiles the dictionary of weight-positions into a lookup table over the
+    code points : table[ord(char)] is the weight-position of char, -1 for the
+    characters not in the dictionary (case 10). The last cell (-1) is shared by
+    all the code points above the highest code point of the dictionary.
+
+    :param dictionnary_char_position_weight: dictionnary with char (key) and it weight-position (value)
+    :returns: weight-positions by code point
+    :type returns: np.ndarray
+    """
+    codes = np.array([ord(char) for char in dictionnary_char_position_weight], dtype=np.int64)
+    table = np.full(codes.max() + 2 if len(codes) else 1, -1, dtype=np.float32)
+    table[codes] = list(dictionnary_char_position_weight.values())
+    return table
+
+
+@functools.lru_cache(maxsize=None)
+def get_char_weights(weight_punctuation: float = 0.5,
+                     weight_acute: float = 0.5,
+                     weight_capitalize: float = 0.5,
+                     weight_space: float = 0) -> tuple:
+    """builds the dictionary of weight-positions and its lookup table once
+    per process and per weights (see SetDictionaryCharWeightPosition), both
+    read-only as they are shared by all the sequences
+
+    :returns: dictionary with char (key) and position-weight (value) / lookup table
+    :type returns: tuple (types.MappingProxyType, np.ndarray)
+    """
+    dictionary = SetDictionaryCharWeightPosition(weight_punctuation,
+                                                 weight_acute,
+                                                 weight_capitalize,
+                                                 weight_space)._get_dict_char_weight()
+    table = get_weight_table(dictionary)
+    table.flags.writeable = False
+    return types.MappingProxyType(dictionary), table
+
+
+@functools.lru_cache(maxsize=None)
+def get_char_weights_html(weight_punctuation: float = 0.5,
+                          weight_acute: float = 0.5,
+                          weight_capitalize: float = 0.5,
+                          weight_space: float = 0) -> str:
+    """renders the dictionary of weight-positions in an HTML table with pandas,
+    once per process and per weights
+
+    :returns: HTML table of the characters and their weight-position
+    :type returns: str
+    """
+    import pandas as pd
+    dictionary, _ = get_char_weights(weight_punctuation, weight_acute, weight_capitalize, weight_space)
+    datas = {'characters': ['space' if char == ' ' else char for char in dictionary.keys()],
+             'position-weight': list(dictionary.values())}
+    return pd.DataFrame(data=datas).to_html(justify='justify')
+
+
+def encrypt_steps_sentence_to_signal(sequence: str,
+                                     dictionnary_char_position_weight: dict,
+                                     weight_table: np.ndarray = None) -> tuple:
     """successively encrypts the characters contained in the sequence with
     respect to the key and the dictionary value.
     Also lists the steps in the sequence, such as char1 = 1, char2 = 2 ...
@@ -244,42 +310,462 @@ def encrypt_steps_sentence_to_signal(sequence: str, dictionnary_char_position_we
     :param sequence: sequence to encrypt
     :type sequence: str
     :param dictionnary_char_position_weight: dictionnary with char (key) and it weight-position (value)
-    :returns: encrypted sequence / steps in the sequence
-    :type returns: list
+    :param weight_table: lookup table of the dictionary if already compiled (see get_weight_table())
+    :returns: encrypted sequence (float32) / steps in the sequence
+    :type returns: tuple of np.ndarray
     """
-
-    # case 10 : char no solve in dict (-1)
-    encrypt_sequence_weight_position = [dictionnary_char_position_weight[char]
-                                        if char in dictionnary_char_position_weight.keys()
-                                        else -1
-                                        for char in sequence]
-    sequence_steps = [char_sequence for char_sequence in range(len(sequence))]
+    if weight_table is None:
+        weight_table = get_weight_table(dictionnary_char_position_weight)
+    codes = characters_codes(sequence)
+    # case 10 : char no solve in dict (-1), last cell of the table
+    encrypt_sequence_weight_position = np.take(weight_table, np.minimum(codes, len(weight_table) - 1))
+    sequence_steps = np.arange(len(codes))
 
     return encrypt_sequence_weight_position, sequence_steps
 
 
-def _get_deltas(reference_encrypt: list, prediction_encrypt: list, reference: str, prediction: str) -> int:
+def _get_deltas(reference_encrypt: np.ndarray,
+                prediction_encrypt: np.ndarray,
+                reference: str,
+                prediction: str) -> np.ndarray:
     """retrieve the deltas which correspond to the difference in the weight-position
     of sequence 1 compared to sequence 2 such that :
 
     Formula : delta = yS2 - yS1
 
+    the deltas stop at the end of the shortest sequence.
+
     :param reference_encrypt: reference sequence encrypted with dictionary
-    :type reference_encrypt: list
+    :type reference_encrypt: np.ndarray
     :param prediction_encrypt: prediction sequence encrypted with dictionary
-    :type prediction_encrypt: list
+    :type prediction_encrypt: np.ndarray
     :param reference: sequence of char (reference)
     :type reference: str
     :param prediction: sequence of char (prediction)
     :type prediction: str
-    :return: list of deltas
-    :type return: list
+    :return: deltas
+    :type return: np.ndarray
+
+    """
+    size = min(len(reference_encrypt), len(prediction_encrypt))
+    return prediction_encrypt[:size] - reference_encrypt[:size]
+
+
+class DeltasAccumulator:
+    """statistics of the deltas of one or several sequences, fed page by page
+    and mergeable (pages of other objects or processes) :
+
+    - mean, variance and standard deviation with the Welford update, merged
+      with the Chan et al. formula (no sum of squares, stable for the long
+      sequences)
+    - histogram of the deltas (values and occurrences), the deltas being
+      differences of weight-positions they take few distinct values, to sum
+      the deltas into the standard deviation intervals once μ and δ are known
+
+    Example
+    -------
+    >>> corpus = DeltasAccumulator()
+    >>> for page in pages:
+    ...     corpus.merge(SequencesToSignals(page.source, page.prediction).deltas_statistics)
+    >>> corpus.mean, corpus.standard_deviation, corpus.interval_sums()
+
+    Attributes
+    ==========
+    count: int
+        number of deltas
+    mean: float
+        average of the deltas (μ)
+    m2: float
+        sum of the squared differences to the mean
+    values: np.ndarray
+        distinct values of the deltas (sorted)
+    counts: np.ndarray
+        occurrences of each value
 
     """
-    deltas = []
-    for delta_1, delta_2 in zip(reference_encrypt, prediction_encrypt):
-        deltas.append(delta_2 - delta_1)
-    return deltas
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.values = np.empty(0, dtype=np.float64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _combine(self, count: int, mean: float, m2: float, values: np.ndarray, counts: np.ndarray) -> None:
+        """adds the moments and the histogram of another set of deltas"""
+        if count == 0:
+            return
+        total = self.count + count
+        difference = mean - self.mean
+        self.mean += difference * count / total
+        self.m2 += m2 + difference * difference * self.count * count / total
+        self.count = total
+        values, inverse = np.unique(np.concatenate((self.values, values)), return_inverse=True)
+        self.counts = np.bincount(inverse.reshape(-1), weights=np.concatenate((self.counts, counts)),
+                                  minlength=len(values)).astype(np.int64)
+        self.values = values
+
+    def add(self, list_deltas: np.ndarray) -> 'DeltasAccumulator':
+        """adds the deltas of a sequence (see _get_deltas())
+
+        :param list_deltas: deltas
+        :type list_deltas: np.ndarray
+        :return: the accumulator itself
+        :type return: DeltasAccumulator
+        """
+        deltas = np.asarray(list_deltas, dtype=np.float64)
+        if len(deltas):
+            mean = float(deltas.mean())
+            centered = deltas - mean
+            values, counts = np.unique(deltas, return_counts=True)
+            self._combine(len(deltas), mean, float(np.dot(centered, centered)), values, counts)
+        return self
+
+    def merge(self, other: 'DeltasAccumulator') -> 'DeltasAccumulator':
+        """adds the deltas of another accumulator
+
+        :param other: accumulator to merge
+        :type other: DeltasAccumulator
+        :return: the accumulator itself
+        :type return: DeltasAccumulator
+        """
+        self._combine(other.count, other.mean, other.m2, other.values, other.counts)
+        return self
+
+    @property
+    def variance(self) -> float:
+        """variance of the deltas (population)"""
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def standard_deviation(self) -> float:
+        """standard deviation of the deltas (δ)"""
+        return math.sqrt(self.variance)
+
+    def interval_sums(self, coefficient_large: float = 2, coefficient_mid: float = 1.5) -> tuple:
+        """sums of the deltas by standard deviation interval, each delta goes
+        in the first interval matched :
+
+        - big : out of μ ± coefficient_large*δ (absolute values)
+        - large : between μ ± coefficient_mid*δ and μ ± coefficient_large*δ (absolute values)
+        - mid : between μ ± δ and μ ± coefficient_mid*δ
+        - small : between μ and μ ± δ
+
+        :param coefficient_large: coefficient of the large interval
+        :param coefficient_mid: coefficient of the mid interval
+        :return: sums of the deltas small, mid, large and big
+        :type return: tuple
+        """
+        mu, sigma, deltas = self.mean, self.standard_deviation, self.values
+        big = (deltas <= mu - coefficient_large * sigma) | (deltas >= mu + coefficient_large * sigma)
+        large = ~big & (((mu + coefficient_mid * sigma <= deltas) & (deltas < mu + coefficient_large * sigma)) |
+                        ((mu - coefficient_large * sigma < deltas) & (deltas <= mu - coefficient_mid * sigma)))
+        mid = ~big & ~large & (((mu - sigma <= deltas) & (deltas < mu - coefficient_mid * sigma)) |
+                               ((mu + sigma <= deltas) & (deltas < mu + coefficient_mid * sigma)))
+        small = ~big & ~large & ~mid & (((mu < deltas) & (deltas <= mu + sigma)) |
+                                        ((mu - sigma <= deltas) & (deltas < mu)))
+
+        def weighted_sum(mask: np.ndarray, values: np.ndarray) -> float:
+            return float(np.dot(values[mask], self.counts[mask]))
+
+        return (weighted_sum(small, deltas),
+                weighted_sum(mid, deltas),
+                weighted_sum(large, np.abs(deltas)),
+                weighted_sum(big, np.abs(deltas)))
+
+
+class SignalWindow:
+    """an interval (sample_b:sample_e) of the signals of two sequences, what
+    the figures display. The arrays are views on the signals of the whole
+    sequences (see SequencesToSignals.window()) or the encoding of the
+    interval only (see from_sequences()) : the steps keep the positions of
+    the characters in the sequences.
+
+    Attributes
+    ==========
+    sample_b: int
+        first position of the window
+    sample_e: int
+        end position of the window (excluded)
+    reference: str
+        characters of the reference in the window
+    prediction: str
+        characters of the prediction in the window
+    reference_encrypt / prediction_encrypt: np.ndarray
+        weight-positions of the characters in the window
+    reference_steps / prediction_steps: np.ndarray
+        positions of the characters in the sequences
+    list_deltas: np.ndarray
+        deltas of the window
+    list_steps_min: np.ndarray
+        positions of the deltas in the sequences
+
+    """
+
+    def __init__(self, sample_b: int, sample_e: int,
+                 reference: str, prediction: str,
+                 reference_encrypt: np.ndarray, prediction_encrypt: np.ndarray,
+                 reference_steps: np.ndarray, prediction_steps: np.ndarray,
+                 list_deltas: np.ndarray, list_steps_min: np.ndarray) -> None:
+        self.sample_b = sample_b
+        self.sample_e = sample_e
+        self.reference = reference
+        self.prediction = prediction
+        self.reference_encrypt = reference_encrypt
+        self.prediction_encrypt = prediction_encrypt
+        self.reference_steps = reference_steps
+        self.prediction_steps = prediction_steps
+        self.list_deltas = list_deltas
+        self.list_steps_min = list_steps_min
+
+    @classmethod
+    def from_sequences(cls, reference: str, prediction: str,
+                       sample_b: int = 0, sample_e: int = 70, **weights: float) -> 'SignalWindow':
+        """encodes only the characters of the window, without the signals
+        of the whole sequences (same result as SequencesToSignals.window())
+
+        :param reference: user's reference sequence
+        :param prediction: user's prediction sequence
+        :param sample_b: first position of the window
+        :param sample_e: end position of the window (excluded)
+        :param weights: weights of transformations (see SetDictionaryCharWeightPosition)
+        :return: window of the signals
+        :type return: SignalWindow
+        """
+        dictionary, weight_table = get_char_weights(*SetDictionaryCharWeightPosition(**weights).weights)
+        sample_b = max(sample_b, 0)
+        reference, prediction = reference[sample_b:sample_e], prediction[sample_b:sample_e]
+        reference_encrypt, reference_steps = encrypt_steps_sentence_to_signal(reference, dictionary, weight_table)
+        prediction_encrypt, prediction_steps = encrypt_steps_sentence_to_signal(prediction, dictionary, weight_table)
+        list_deltas = _get_deltas(reference_encrypt, prediction_encrypt, reference, prediction)
+        return cls(sample_b, sample_e, reference, prediction,
+                   reference_encrypt, prediction_encrypt,
+                   reference_steps + sample_b, prediction_steps + sample_b,
+                   list_deltas, np.arange(sample_b, sample_b + len(list_deltas)))
+
+
+def plot_signal_window(window: SignalWindow,
+                       dpi=150,
+                       save_figure=False,
+                       title="Sequences to Signals analyzer\n",
+                       char_types_area=True,
+                       min_number=29,
+                       max_number=38,
+                       min_alphabetic=1,
+                       max_alphabetic=26,
+                       min_interlacted=27,
+                       max_interlacted=28.5,
+                       limit_lines=True,
+                       punctuation_line=0.5,
+                       space_line=0,
+                       unrecognized_char_line=-1,
+                       error_boxes=True,
+                       average_deltas_scatter=False,
+                       display_html=True,
+                       figsize=(25, 15)):
+    """
+    plots the signals of a window of the sequences (see SignalWindow), the
+    figure only holds the characters of the window : its cost does not
+    depend on the length of the sequences.
+
+    Args:
+
+        window: SignalWindow
+            interval of the sequences to plot (sample_b:sample_e)
+
+        General Custom Figure
+        ---------------------
+
+        dpi: int (by default dpi=150)
+            adjusts the quality of the figure
+        save_figure: bool (by default save_figure=False)
+            The second parameter.
+        title: str (by default "Sequences to Signals analyzer")
+            figure title
+
+        Adjust the char spaces
+        ----------------------
+
+        Note : adjust the all parameters bellow.
+
+        char_types_area : bool (by default char_types_area=True)
+            draw the color limitations spaces on figure
+
+        with :
+
+            min_number/max_number (by default min_number =29/max_number=38)
+            min_alphabetic/max_alphabetic (by default min_alphabetic=1/max_alphabetic=26)
+            min_interlacted/max_interlacted (by default min_interlacted=27/max_interlacted=28.5)
+
+        Adjust the limit lines
+        ----------------------
+
+        Note : adjust the all parameters bellow.
+
+        limit_lines : bool (by default limit_lines=True)
+            draw a symbolic lines of special type char
+
+        with :
+            punctuation_line (by default punctuation_line=0.5)
+            space_line (by default space_line=0)
+            unrecognized_char_line (by default unrecognized_char_line=-1)
+
+        Draw Error Boxes
+        ----------------
+
+        error_boxes: bool (by default error_boxes=True)
+            draw error boxes on the weight-positions of the prediction
+            sequence not similar to the reference sequence.
+
+        Draw average deltas scatter
+        ---------------------------
+
+        average_deltas_scatter : bool (by default average_deltas_scatter=False)
+            draw the mean of the deltas as points.
+
+
+    Returns:
+        plot of sentences into signals
+
+    """
+
+    reference, prediction = window.reference, window.prediction
+    reference_steps, prediction_steps = window.reference_steps, window.prediction_steps
+    reference_encrypt, prediction_encrypt = window.reference_encrypt, window.prediction_encrypt
+    list_deltas, list_step_min = window.list_deltas, window.list_steps_min
+    sample_b, sample_e = window.sample_b, window.sample_e
+
+    import matplotlib.pyplot as plt
+    from matplotlib import patches
+    from matplotlib.collections import PatchCollection
+    from matplotlib.patches import Rectangle
+
+    # initialize the size of the figure and the quality of the resolution
+    figure, ax = plt.subplots(dpi=dpi, figsize=figsize)
+
+    # initialize the signals (x: weight / cost of the characters in the sequence /
+    # y: sequence of characters)
+    plt.plot(reference_steps, reference_encrypt, "-b", label=f'Sequence-signal 1', marker="s", lw=2.5)
+    plt.plot(prediction_steps, prediction_encrypt, "-r", label=f'Sequence-signal 2', marker="s", lw=2.5)
+
+    #####################################################################
+
+    # check the average of deltas
+    if average_deltas_scatter:
+        plt.scatter(list_step_min, list_deltas, s=300, c='coral', label='average of deltas')
+
+    #####################################################################
+
+    # Generate error boxes according to the error position of prediction sequence
+
+    if error_boxes:
+        error_boxes = []
+        x = []
+        y = []
+        xerr = []
+        yerr = []
+        for x_S1, y_S1, x_S2, y_S2 in zip(reference_steps, reference_encrypt, prediction_steps, prediction_encrypt):
+            if y_S1 != y_S2:
+                x.append(x_S2)
+                y.append(y_S2)
+                xerr.append(1)
+                yerr.append(1.5)
+                rect = Rectangle((x_S2 - 1, y_S2 - 1.5), 2, 3, color='r', alpha=0.5)
+                error_boxes.append(rect)
+
+        xValues = x
+        yValues = y
+        xErrorValues = xerr
+        yErrorValues = yerr
+        plt.scatter(xValues, yValues, zorder=2)
+        plt.errorbar(xValues, yValues, xerr=xErrorValues, yerr=yErrorValues,
+                     fmt='none', capsize=10, ecolor='k', zorder=1, alpha=1, lw=2)
+
+        collection_errors_boxes = PatchCollection(error_boxes, facecolors='r', alpha=0.3)
+        ax.add_collection(collection_errors_boxes)
+
+    #####################################################################
+
+    # Manage character type spaces / Manage area char types
+
+    if char_types_area:
+        # number space
+        ax.add_artist(patches.Rectangle((0, min_number), len(prediction) + len(reference), max_number,
+                                        edgecolor='black', facecolor='orange',
+                                        fill=True, linestyle='dashed', label='rect',
+                                        linewidth=3, zorder=1, alpha=0.09))
+
+        # alphabetical letter space
+        ax.add_artist(patches.Rectangle((0, min_alphabetic), len(prediction) + len(reference), max_alphabetic,
+                                        edgecolor='black', facecolor='blue',
+                                        fill=True, linestyle='dashed', label='rect',
+                                        linewidth=3, zorder=1, alpha=0.09))
+
+        # interlaced character space
+        ax.add_artist(
+            patches.Rectangle((0, min_interlacted), len(prediction) + len(reference), max_interlacted,
+                              edgecolor='black', facecolor='green',
+                              fill=True, linestyle='dashed', label='rect',
+                              linewidth=3, zorder=1, alpha=0.09))
+
+    #####################################################################
+
+    # Creation of lines to represent the passage of signals by:
+    # we define two points (x1, y1) and (x2, y2)
+    if limit_lines:
+        plt.plot([sample_e, 0.0], [punctuation_line, punctuation_line], 'm-', lw=3, label='punctuation line')
+        plt.plot([sample_e, 0.0], [space_line, space_line], 'c-', lw=3, label="space line")
+        plt.plot([sample_e, 0.0], [unrecognized_char_line, unrecognized_char_line], 'y-', lw=3,
+                 label="unrecognized char line")
+
+    #####################################################################
+
+    # Addition of values in x and y which correspond to the coordinate points
+    #ax = plt.gca()
+    # -- issue : display the "letter = cost-position" on the ordinate
+    # y_labels_axis = []
+    # for char, position_cost in self.dictionary_char_weight_cost.items():
+    # if position_cost in self.prediction_deltas or position_cost in self.reference_deltas:
+    # y_labels_axis.append(f'{char}={position_cost}')
+    # ax.yaxis.set_ticklabels(set(y_labels_axis))
+    #ax.xaxis.set_ticks(list(range(sample_b, sample_e)))
+
+    ax.set_xlim(sample_b, sample_e)
+    ax.xaxis.set_ticks(list(range(sample_b, sample_e)))
+    ax.yaxis.set_ticks(np.unique(np.concatenate((reference_encrypt, prediction_encrypt))))
+    #ax.yaxis.set_tick_params(labelsize=8)
+    #ax.xaxis.set_tick_params(labelsize=8)
+    #ax.yaxis.grid(True)
+    #ax.xaxis.grid(True)
+    plt.xticks(rotation=65)
+    plt.yticks(rotation=13)
+    #plt.xscale("linear")
+
+    #####################################################################
+
+    # Section to customize the visualizations
+
+    # highlights the abscess and ordinate axis
+    plt.axhline(color='k')  # axe des x
+    plt.axvline(color='k')  # axe des y
+
+    plt.suptitle(title, family='serif', fontsize=26, ha='center')  # print general title
+    plt.grid(color='k', linestyle='-', linewidth=0.4)  # print a grid
+    plt.xlabel('position of char in reference sentence and prediction sentence', family='serif', fontsize=14)  # x label
+    plt.ylabel('weight-position per char in dictionary', family='serif', fontsize=14)  # y label
+    plt.legend()  # print labels
+
+    #####################################################################
+
+    # If save figure activate
+    if save_figure:
+        plt.savefig(f"{title}.png", dpi=dpi)
+
+    if display_html:
+        return figure
+    else:
+        return plt.show()
+
 
 
 class SequencesToSignals(SetDictionaryCharWeightPosition):
@@ -292,29 +778,35 @@ class SequencesToSignals(SetDictionaryCharWeightPosition):
     Attributes
     ==========
     object_char_position_weight_dict: obj
-        get the attributes and properties of the class SetDictionaryCharWeightPosition
+        get the attributes and properties of the class SetDictionaryCharWeightPosition (the object itself)
 
     dictionary_latchar_position_weight : dict
         dictionary of the character (key) and its weight-position (value)
         according to the values defined in SetDictionaryCharWeightPosition class
 
-    sequence_reference_encrypt: list
+    weight_table: np.ndarray
+        weight-positions by code point (see get_weight_table())
+
+    sequence_reference_encrypt: np.ndarray
         reference sequence encrypted
 
-    sequence_reference_steps: list
+    sequence_reference_steps: np.ndarray
         reference sequence steps
 
-    sequence_prediction_encrypt: list
+    sequence_prediction_encrypt: np.ndarray
         prediction sequence encrypted
 
-    sequence_prediction_steps: list
+    sequence_prediction_steps: np.ndarray
         prediction sequence steps
 
     Metrics
     =======
 
-    list_deltas: list
-        list of deltas (yS2 - yS1) compute with _get_deltas() function
+    list_deltas: np.ndarray
+        deltas (yS2 - yS1) compute with _get_deltas() function
+    deltas_statistics: DeltasAccumulator
+        mean, variance and histogram of the deltas in one pass, can be
+        merged with the other sequences of a corpus
     expected_value_deltas: int
         value of deltas average is the result of (sum(deltas)/total deltas).
         basic it returns a negative result, however for readability
@@ -331,30 +823,51 @@ class SequencesToSignals(SetDictionaryCharWeightPosition):
         user's reference sequence
     sequence_prediction: str
         user's prediction sequence
+    weights: float (keywords)
+        weights of transformations (see SetDictionaryCharWeightPosition),
+        each set of weights has its own shared dictionary
 
     """
 
-    def __init__(self, sequence_reference: str, sequence_prediction: str) -> None:
-        SetDictionaryCharWeightPosition.__init__(self)
+    def __init__(self, sequence_reference: str, sequence_prediction: str, **weights: float) -> None:
+        SetDictionaryCharWeightPosition.__init__(self, **weights)
         self.sequence_reference = sequence_reference
         self.sequence_prediction = sequence_prediction
-        self.object_char_position_weight_dict = SetDictionaryCharWeightPosition()
-        self.dictionary_latchar_position_weight = self.object_char_position_weight_dict._get_dict_char_weight()
-
-        def _get_dictionary_char_pos_weight_to_html(dictionary: dict) -> str:
-            datas = {'characters': ['space' if char == ' ' else char for char in dictionary.keys()],
-                     'position-weight': [values for values in dictionary.values()]}
-            df = pd.DataFrame(data=datas)
-            df_html = df.to_html(justify='justify')
-            return df_html
-
-        self.dictionary_latchar_position_weight_html = _get_dictionary_char_pos_weight_to_html(self.dictionary_latchar_position_weight)
+        self.object_char_position_weight_dict = self
+        # dictionary and lookup table shared by the objects with the same weights
+        self.dictionary_latchar_position_weight, self.weight_table = get_char_weights(*self.weights)
         self.sequence_reference_encrypt, self.sequence_reference_steps = encrypt_steps_sentence_to_signal(
-            self.sequence_reference, self.dictionary_latchar_position_weight)
+            self.sequence_reference, self.dictionary_latchar_position_weight, self.weight_table)
         self.sequence_prediction_encrypt, self.sequence_prediction_steps = encrypt_steps_sentence_to_signal(
-            self.sequence_prediction, self.dictionary_latchar_position_weight)
+            self.sequence_prediction, self.dictionary_latchar_position_weight, self.weight_table)
         self.list_deltas = _get_deltas(self.sequence_reference_encrypt, self.sequence_prediction_encrypt,
                                        self.sequence_reference, self.sequence_prediction)
+        self.deltas_statistics = DeltasAccumulator().add(self.list_deltas)
+
+    def window(self, sample_b: int = 0, sample_e: int = 70) -> SignalWindow:
+        """window of the signals between sample_b and sample_e, the arrays are
+        views on the signals of the sequences (nothing is encoded again)
+
+        :param sample_b: first position of the window
+        :param sample_e: end position of the window (excluded)
+        :return: window of the signals
+        :type return: SignalWindow
+        """
+        sample_b = max(sample_b, 0)
+        return SignalWindow(sample_b, sample_e,
+                            self.sequence_reference[sample_b:sample_e],
+                            self.sequence_prediction[sample_b:sample_e],
+                            self.sequence_reference_encrypt[sample_b:sample_e],
+                            self.sequence_prediction_encrypt[sample_b:sample_e],
+                            self.sequence_reference_steps[sample_b:sample_e],
+                            self.sequence_prediction_steps[sample_b:sample_e],
+                            self.list_deltas[sample_b:sample_e],
+                            np.arange(sample_b, max(sample_b, min(sample_e, len(self.list_deltas)))))
+
+    @property
+    def dictionary_latchar_position_weight_html(self) -> str:
+        """HTML table of the dictionary, rendered once per process and per weights"""
+        return get_char_weights_html(*self.weights)
 
     def expected_value_deltas(self) -> int:
         """calculates the average of the deltas
@@ -364,33 +877,23 @@ class SequencesToSignals(SetDictionaryCharWeightPosition):
         :param return: average score of deltas
         :type return: int
         """
-        if len(self.sequence_prediction) == 0:
+        if self.deltas_statistics.count == 0:
             return "no expected value deltas because your prediction is null"
-        else:
-            sum_deltas = 0
-            for delta in self.list_deltas:
-                sum_deltas += delta
-                expected_value = (sum_deltas / len(self.list_deltas))
-        return expected_value
+        return self.deltas_statistics.mean
 
-    def variance_standard_deviation_deltas(self, expected_value: int) -> int:
-        """calculates the variance of the deltas
+    def variance_standard_deviation_deltas(self, expected_value: int = None) -> int:
+        """calculates the variance of the deltas, read from the
+        accumulator (the mean is not needed anymore, the parameter is kept
+        for the former calls)
 
         :param list_deltas: list of deltas
         :type list_deltas: list
         :param returns: variance score of deltas / standard deviation score
         :type return: int
         """
-        if len(self.sequence_prediction) == 0:
+        if self.deltas_statistics.count == 0:
             return "no variance and standard deviation because the prediction is null"
-        else:
-            s1 = 0
-            n = len(self.list_deltas)
-            for delta in self.list_deltas:
-                s1 += delta * delta
-            variance = (s1 / n) - (expected_value ** 2)
-            standard_deviation = math.sqrt(variance)
-        return variance, standard_deviation
+        return self.deltas_statistics.variance, self.deltas_statistics.standard_deviation
 
 
 class PlotSTS(SequencesToSignals):
@@ -452,8 +955,15 @@ class PlotSTS(SequencesToSignals):
         dictionary of the character (key) and its weight-position (value)
         according to the values defined in SetDictionaryCharWeightPosition class
 
-    list_deltas: list
-        list of deltas
+    list_deltas: np.ndarray
+        deltas
+
+    deltas_statistics: DeltasAccumulator
+        statistics of the deltas if already computed (see SequencesToSignals),
+        by default computed from list_deltas
+
+    weights: float (keywords)
+        weights of transformations used for the dictionary (see SetDictionaryCharWeightPosition)
 
     """
 
@@ -465,10 +975,22 @@ class PlotSTS(SequencesToSignals):
                  reference_steps,
                  prediction_steps,
                  dictionary_char_weight_cost,
-                 list_deltas) -> None:
-
-        SequencesToSignals.__init__(self, reference, prediction)
-        self.GroupSequencesToSignals = SequencesToSignals(reference, prediction)
+                 list_deltas,
+                 deltas_statistics: DeltasAccumulator = None,
+                 **weights: float) -> None:
+
+        # the signals are given : they are not computed again
+        # by SequencesToSignals.__init__()
+        SetDictionaryCharWeightPosition.__init__(self, **weights)
+        self.sequence_reference = reference
+        self.sequence_prediction = prediction
+        self.sequence_reference_encrypt = reference_encrypt
+        self.sequence_prediction_encrypt = prediction_encrypt
+        self.sequence_reference_steps = reference_steps
+        self.sequence_prediction_steps = prediction_steps
+        self.dictionary_latchar_position_weight = dictionary_char_weight_cost
+        self.object_char_position_weight_dict = self
+        self.GroupSequencesToSignals = self
 
         self.reference = reference
         self.prediction = prediction
@@ -482,7 +1004,11 @@ class PlotSTS(SequencesToSignals):
         self.dictionary_char_weight_cost = dictionary_char_weight_cost
 
         self.list_deltas = list_deltas
-        self.list_steps_min = min(self.reference_steps, self.prediction_steps)
+        if deltas_statistics is None:
+            deltas_statistics = DeltasAccumulator().add(list_deltas)
+        self.deltas_statistics = deltas_statistics
+        # steps of the deltas (shortest sequence)
+        self.list_steps_min = np.arange(len(self.list_deltas))
 
         # variables for probabilities
         # ---------------------------
@@ -512,50 +1038,13 @@ class PlotSTS(SequencesToSignals):
         self.mu_δ_negative = (self.μ - self.δ)
         self.mu_δ_positive = (self.μ + self.δ)
 
-        def catch_sum_deltas_into_intervals(list_deltas: list,
-                                            mu_2δ_negative: int,
-                                            mu_2δ_positive: int,
-                                            mu_1_5δ_negative: int,
-                                            mu_1_5δ_positive: int,
-                                            mu_δ_negative: int,
-                                            mu_δ_positive: int,
-                                            mu: int):
-            """
-
-            """
-            # initialization of the intervals to recover the deltas sums
-            sum_deltas_big = 0
-            sum_deltas_large = 0
-            sum_deltas_mid = 0
-            sum_deltas_small = 0
-
-            for delta in list_deltas:
-                if (delta <= mu_2δ_negative) or (delta >= mu_2δ_positive):
-                    sum_deltas_big += abs(delta)
-
-                elif (mu_1_5δ_positive <= delta < mu_2δ_positive) or (mu_2δ_negative < delta <= mu_1_5δ_negative):
-                    sum_deltas_large += abs(delta)
-
-                elif (mu_δ_negative <= delta < mu_1_5δ_negative) or (mu_δ_positive <= delta < mu_1_5δ_positive):
-                    sum_deltas_mid += delta
-
-                elif (mu < delta <= mu_δ_positive) or (mu_δ_negative <= delta < mu):
-                    sum_deltas_small += delta
-
-            return sum_deltas_small, sum_deltas_mid, sum_deltas_large, sum_deltas_big
-
-        ## retrieving delta sum intervals
+        ## retrieving delta sum intervals (from the histogram of the deltas)
 
         self.sum_deltas_small, \
         self.sum_deltas_mid, \
         self.sum_deltas_large, \
-        self.sum_deltas_big = catch_sum_deltas_into_intervals(self.list_deltas,
-                                                              self.mu_2δ_negative,
-                                                              self.mu_2δ_positive,
-                                                              self.mu_1_5δ_negative,
-                                                              self.mu_1_5δ_positive,
-                                                              self.mu_δ_negative,
-                                                              self.mu_δ_positive, self.μ)
+        self.sum_deltas_big = self.deltas_statistics.interval_sums(self.coefficient_large,
+                                                                   self.coefficient_mid)
 
     def _plot_sentences_signal(self,
                                dpi=150,
@@ -578,220 +1067,29 @@ class PlotSTS(SequencesToSignals):
                                average_deltas_scatter=False,
                                display_html=True,
                                figsize=(25, 15)):
+        """plots the signals between sample_b and sample_e, see plot_signal_window()
+        for the options. If you want to get a nice visible figure we recommend
+        that you do not exceed 70 char (sample_e - sample_b).
         """
-        PlotSTS Class method are similar to regular functions.
-
-        Args:
-
-            General Custom Figure
-            ---------------------
-
-            dpi: int (by default dpi=150)
-                adjusts the quality of the figure
-            save_figure: bool (by default save_figure=False)
-                The second parameter.
-            title: str (by default "Sequences to Signals analyzer")
-                figure title
-
-            Determine the length of the sample text
-            ---------------------------------------
-
-            sample: int (by default sample=70)
-                If you want to get a nice visible figure we
-                recommend that you do not exceed 70 char
-
-            Adjust the char spaces
-            ----------------------
-
-            Note : adjust the all parameters bellow.
-
-            char_types_area : bool (by default char_types_area=True)
-                draw the color limitations spaces on figure
-
-            with :
-
-                min_number/max_number (by default min_number =29/max_number=38)
-                min_alphabetic/max_alphabetic (by default min_alphabetic=1/max_alphabetic=26)
-                min_interlacted/max_interlacted (by default min_interlacted=27/max_interlacted=28.5)
-
-            Adjust the limit lines
-            ----------------------
-
-            Note : adjust the all parameters bellow.
-
-            limit_lines : bool (by default limit_lines=True)
-                draw a symbolic lines of special type char
-
-            with :
-                punctuation_line (by default punctuation_line=0.5)
-                space_line (by default space_line=0)
-                unrecognized_char_line (by default unrecognized_char_line=-1)
-
-            Draw Error Boxes
-            ----------------
-
-            error_boxes: bool (by default error_boxes=True)
-                draw error boxes on the weight-positions of the prediction
-                sequence not similar to the reference sequence.
-
-            Draw average deltas scatter
-            ---------------------------
-
-            average_deltas_scatter : bool (by default average_deltas_scatter=False)
-                draw the mean of the deltas as points.
-
-
-        Returns:
-            plot of sentences into signals
-
-        """
-
-        # Take a text sample if the sentence is more than 70 char (customizable interval)
-
-        if len(self.reference) > sample_e or len(self.prediction) > sample_e:
-            reference = self.reference[sample_b:sample_e]
-            prediction = self.prediction[sample_b:sample_e]
-            reference_steps = self.reference_steps[sample_b:sample_e]
-            prediction_steps = self.prediction_steps[sample_b:sample_e]
-            reference_encrypt = self.reference_encrypt[sample_b:sample_e]
-            prediction_encrypt = self.prediction_encrypt[sample_b:sample_e]
-            list_deltas = self.list_deltas[sample_b:sample_e]
-            list_step_min = self.list_steps_min[sample_b:sample_e]
-        else:
-            reference = self.reference
-            prediction = self.prediction
-            reference_steps = self.reference_steps
-            prediction_steps = self.prediction_steps
-            reference_encrypt = self.reference_encrypt
-            prediction_encrypt = self.prediction_encrypt
-            list_deltas = self.list_deltas
-            list_step_min = self.list_steps_min
-
-        # initialize the size of the figure and the quality of the resolution
-        figure, ax = plt.subplots(dpi=dpi, figsize=figsize)
-
-        # initialize the signals (x: weight / cost of the characters in the sequence /
-        # y: sequence of characters)
-        plt.plot(reference_steps, reference_encrypt, "-b", label=f'Sequence-signal 1', marker="s", lw=2.5)
-        plt.plot(prediction_steps, prediction_encrypt, "-r", label=f'Sequence-signal 2', marker="s", lw=2.5)
-
-        #####################################################################
-
-        # check the average of deltas
-        if average_deltas_scatter:
-            plt.scatter(list_step_min, list_deltas, s=300, c='coral', label='average of deltas')
-
-        #####################################################################
-
-        # Generate error boxes according to the error position of prediction sequence
-
-        if error_boxes:
-            error_boxes = []
-            x = []
-            y = []
-            xerr = []
-            yerr = []
-            for x_S1, y_S1, x_S2, y_S2 in zip(reference_steps, reference_encrypt, prediction_steps, prediction_encrypt):
-                if y_S1 != y_S2:
-                    x.append(x_S2)
-                    y.append(y_S2)
-                    xerr.append(1)
-                    yerr.append(1.5)
-                    rect = Rectangle((x_S2 - 1, y_S2 - 1.5), 2, 3, color='r', alpha=0.5)
-                    error_boxes.append(rect)
-
-            xValues = x
-            yValues = y
-            xErrorValues = xerr
-            yErrorValues = yerr
-            plt.scatter(xValues, yValues, zorder=2)
-            plt.errorbar(xValues, yValues, xerr=xErrorValues, yerr=yErrorValues,
-                         fmt='none', capsize=10, ecolor='k', zorder=1, alpha=1, lw=2)
-
-            collection_errors_boxes = PatchCollection(error_boxes, facecolors='r', alpha=0.3)
-            ax.add_collection(collection_errors_boxes)
-
-        #####################################################################
-
-        # Manage character type spaces / Manage area char types
-
-        if char_types_area:
-            # number space
-            ax.add_artist(patches.Rectangle((0, min_number), (max(len(prediction+reference), len(prediction+reference))), max_number,
-                                            edgecolor='black', facecolor='orange',
-                                            fill=True, linestyle='dashed', label='rect',
-                                            linewidth=3, zorder=1, alpha=0.09))
-
-            # alphabetical letter space
-            ax.add_artist(patches.Rectangle((0, min_alphabetic), (max(len(prediction+reference), len(prediction+reference))), max_alphabetic,
-                                            edgecolor='black', facecolor='blue',
-                                            fill=True, linestyle='dashed', label='rect',
-                                            linewidth=3, zorder=1, alpha=0.09))
-
-            # interlaced character space
-            ax.add_artist(
-                patches.Rectangle((0, min_interlacted), (max(len(prediction+reference), len(prediction+reference))), max_interlacted,
-                                  edgecolor='black', facecolor='green',
-                                  fill=True, linestyle='dashed', label='rect',
-                                  linewidth=3, zorder=1, alpha=0.09))
-
-        #####################################################################
-
-        # Creation of lines to represent the passage of signals by:
-        # we define two points (x1, y1) and (x2, y2)
-        if limit_lines:
-            plt.plot([len(list(range(sample_e))), 0.0], [punctuation_line, punctuation_line], 'm-', lw=3, label='punctuation line')
-            plt.plot([len(list(range(sample_e))), 0.0], [space_line, space_line], 'c-', lw=3, label="space line")
-            plt.plot([len(list(range(sample_e))), 0.0], [unrecognized_char_line, unrecognized_char_line], 'y-', lw=3,
-                     label="unrecognized char line")
-
-        #####################################################################
-
-        # Addition of values in x and y which correspond to the coordinate points
-        #ax = plt.gca()
-        # -- issue : display the "letter = cost-position" on the ordinate
-        # y_labels_axis = []
-        # for char, position_cost in self.dictionary_char_weight_cost.items():
-        # if position_cost in self.prediction_deltas or position_cost in self.reference_deltas:
-        # y_labels_axis.append(f'{char}={position_cost}')
-        # ax.yaxis.set_ticklabels(set(y_labels_axis))
-        #ax.xaxis.set_ticks(list(range(sample_b, sample_e)))
-
-        ax.set_xlim(sample_b, sample_e)
-        ax.xaxis.set_ticks(list(range(sample_b, sample_e)))
-        ax.yaxis.set_ticks(reference_encrypt + prediction_encrypt)
-        #ax.yaxis.set_tick_params(labelsize=8)
-        #ax.xaxis.set_tick_params(labelsize=8)
-        #ax.yaxis.grid(True)
-        #ax.xaxis.grid(True)
-        plt.xticks(rotation=65)
-        plt.yticks(rotation=13)
-        #plt.xscale("linear")
-
-        #####################################################################
-
-        # Section to customize the visualizations
-
-        # highlights the abscess and ordinate axis
-        plt.axhline(color='k')  # axe des x
-        plt.axvline(color='k')  # axe des y
-
-        plt.suptitle(title, family='serif', fontsize=26, ha='center')  # print general title
-        plt.grid(color='k', linestyle='-', linewidth=0.4)  # print a grid
-        plt.xlabel('position of char in reference sentence and prediction sentence', family='serif', fontsize=14)  # x label
-        plt.ylabel('weight-position per char in dictionary', family='serif', fontsize=14)  # y label
-        plt.legend()  # print labels
-
-        #####################################################################
-
-        # If save figure activate
-        if save_figure:
-            plt.savefig(f"{title}.png", dpi=dpi)
-
-        if display_html:
-            return figure
-        else:
-            return plt.show()
+        return plot_signal_window(self.window(sample_b, sample_e),
+                                  dpi=dpi,
+                                  save_figure=save_figure,
+                                  title=title,
+                                  char_types_area=char_types_area,
+                                  min_number=min_number,
+                                  max_number=max_number,
+                                  min_alphabetic=min_alphabetic,
+                                  max_alphabetic=max_alphabetic,
+                                  min_interlacted=min_interlacted,
+                                  max_interlacted=max_interlacted,
+                                  limit_lines=limit_lines,
+                                  punctuation_line=punctuation_line,
+                                  space_line=space_line,
+                                  unrecognized_char_line=unrecognized_char_line,
+                                  error_boxes=error_boxes,
+                                  average_deltas_scatter=average_deltas_scatter,
+                                  display_html=display_html,
+                                  figsize=figsize)
 
     """
     
@@ -51,6 +51,7 @@ Date : 22/07/2020
 """
 
 # built-in packages
+import bisect
 import decimal
 import os
 import re
@@ -60,18 +61,16 @@ import difflib
 from collections import Counter, defaultdict
 
 # external packages
-from kraken.lib.dataset import _fast_levenshtein
 from Levenshtein import distance, hamming, editops
-import matplotlib.pyplot as plt
-import nltk
-nltk.download('punkt')
-nltk.download('stopwords')
-from nltk.tokenize import regexp_tokenize, word_tokenize
-from nltk.corpus import stopwords
 import numpy as np
-from numpy import zeros
-import pandas as pd
-import seaborn as sn
+
+# local packages
+from STS_Tools.STSAlign import (MAX_MATRIX_CELLS,
+                                alignment_operations,
+                                levenshtein_distance,
+                                levenshtein_matrix)
+from STS_Tools.STSConfusion import ConfusionAccumulator
+from STS_Tools.STSTokenize import clean_text, tokenizer
 
 
 # MIX OF USEFUL TOOLS FOR SynSemTS
@@ -80,6 +79,48 @@ import seaborn as sn
 
 REMOVE_PUNCTUATION_MAP = dict((ord(char), None) for char in string.punctuation)
 
+# NLTK data packages (key) and their path in nltk_data (value)
+NLTK_PACKAGES = {'punkt': 'tokenizers/punkt', 'stopwords': 'corpora/stopwords'}
+
+# NLTK data packages found or downloaded, and stop words sets by language
+_NLTK_READY = set()
+_STOP_WORDS = {}
+
+
+def load_nltk(package: str) -> object:
+    """import NLTK on first use (long import) and download
+    a data package if it is missing
+
+    Args:
+        package (str): NLTK data package ('punkt' or 'stopwords')
+
+    Returns:
+        object: nltk module
+    """
+    import nltk
+    if package not in _NLTK_READY:
+        try:
+            nltk.data.find(NLTK_PACKAGES[package])
+        except LookupError:
+            nltk.download(package)
+        _NLTK_READY.add(package)
+    return nltk
+
+
+def get_stop_words(language: str = 'french') -> frozenset:
+    """returns the stop words of a language, the NLTK corpus
+    file is read once by language
+
+    Args:
+        language (str, optional): language of the stop words. Defaults to 'french'
+
+    Returns:
+        frozenset: stop words
+    """
+    if language not in _STOP_WORDS:
+        _STOP_WORDS[language] = frozenset(load_nltk('stopwords').corpus.stopwords.words(language))
+    return _STOP_WORDS[language]
+
 
 def normalize(sequence: str) -> list:
     """Tokenize and clean sentence with NLTK tokenizer. Use it for semantic similarity metrics :
@@ -107,74 +148,37 @@ def normalize(sequence: str) -> list:
     Returns:
         list: list of tokens words
     """
-    return word_tokenize(sequence.lower().translate(REMOVE_PUNCTUATION_MAP))
-
-
-def clean_text(text: str) -> str:
-    """option to performs a few cleanning steps to remove non-alphabetic characters
-    use this one for syntaxic similarity metrics if the project necessites
-    remove punctuation and space for :
-
-    # TODO(Lucas): to improve and distinguish numbers and punctuation
-
-    - WER
-    - CER
+    return load_nltk('punkt').word_tokenize(sequence.lower().translate(REMOVE_PUNCTUATION_MAP))
 
-    Example
-    --------
-    >>> sentence = "On dit en 1879 que la puanteur...de son souffle, est moribonde"
-    >>> clean_text(sentence)
-    On dit en  que la puanteurde son souffle est moribonde
-
-    Args:
-        text (str): text to clean
-
-    Returns:
-        str: clean text
-    """
-
-    # replace new line and carriage return with nothing
-    text = text.replace("\n", "").replace("\r", " ")
-
-    # replace the numbers and punctuation  with space
-    punc_list = '!"#$%&()*+,-—./:;<=>«»?@[\]^_{|}~\'`’' + '0123456789'
-    text_without_punct = str.maketrans(dict.fromkeys(punc_list, ""))
-    text = text.translate(text_without_punct)
-    return text
 
+# Metric tool result arrangement
 
-def tokenizer(sentence: str, *args: bool) -> list:
-    """another regex-based tokenizer works in conjunction with the text
-    clean_text() function. returns tokens characters based and words based.
+class LazyProperty:
+    """A decorator for the expensive metrics : the value is computed
+    on first access and stored in the instance under the same name,
+    so the next accesses don't go through the descriptor anymore.
 
-    Example
-    --------
-    >>> sentence = 'Un homme à la mer !'
-    >>> tokenizer(sentence)
-    (['Un', 'homme', 'à', 'la', 'mer'],
-    ['U', 'n', ' ', 'h', 'o', 'm', 'm', 'e', ' ', 'à', ' ', 'l', 'a', ' ', 'm', 'e', 'r', ' ', '!'])
-
-    Args:
-        sentence (str) : sentence to tokenize
-        *args (bool) : if user activate clean_text() function option
+    Note
+    ----
+    same behaviour as functools.cached_property (Python >= 3.8 only)
 
-    Returns:
-        list: words-tokens based
-        list: character-tokens based
+    Attributes:
+        function (function) : method computing the value
+        name (str) : name of the attribute
     """
 
-    if args:
-        # Use NLTK Package for word cutouts (with space)
-        sentence_tokenize_words = regexp_tokenize(clean_text(sentence), pattern='\W', gaps=True)
-        # character cutouts (with space)
-        sentence_tokenize_characters = regexp_tokenize(clean_text(sentence), pattern='', gaps=True)
-    else:
-        sentence_tokenize_words = regexp_tokenize(sentence, pattern='\W', gaps=True)
-        sentence_tokenize_characters = regexp_tokenize(sentence, pattern='', gaps=True)
+    def __init__(self, function) -> None:
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
 
-    return sentence_tokenize_words, sentence_tokenize_characters
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.function(instance)
+        instance.__dict__[self.name] = value
+        return value
 
-# Metric tool result arrangement
 
 def truncate(result: float) -> int:
     """truncate the result to 2 digits after the decimal point (does not display zeros)
@@ -198,7 +202,7 @@ def truncate(result: float) -> int:
     return result_truncate
 
 
-def show_diff_color_html(reference: str, prediction: str) -> list:
+def show_diff_color_html(reference: str, prediction: str, max_cells: int = MAX_MATRIX_CELLS) -> list:
     """Display source and prediction in HTML format and color-code insertions (blue),
     deletions (red), and exact words (green). based on Levensthein algorithm.
 
@@ -210,60 +214,112 @@ def show_diff_color_html(reference: str, prediction: str) -> list:
     "<span style='color:#D2122E'>a</span>", "<span style='color:#4169E1'>n</span>",
     "<span style='color:#D2122E'>t</span>"]
 
+    Note
+    ----
+    Above max_cells cells, the matrix is not kept in memory : its rows are
+    recomputed from checkpoints (see STS_Tools.STSAlign.CheckpointedMatrix),
+    the colors are the same.
+
     Args:
         reference (str): reference sequence
         prediction (str): prediction sequence
+        max_cells (int, optional): maximum number of cells of the full matrix
 
     Returns:
         list: list of HTML tag with color code
     """
     result = []
 
-    # compute distance
-    distance = zeros((len(prediction) + 1, len(reference) + 1), dtype=int)
-    distance[0, 1:] = range(1, len(reference) + 1)
-    distance[1:, 0] = range(1, len(prediction) + 1)
-    for char_pred in range(1, len(prediction) + 1):
-        for char_ref in range(1, len(reference) + 1):
-            delt = 1 if prediction[char_pred - 1] != reference[char_ref - 1] else 0
-            distance[char_pred, char_ref] = min(distance[char_pred - 1, char_ref - 1] + delt,
-                                                distance[char_pred - 1, char_ref] + 1,
-                                                distance[char_pred, char_ref - 1] + 1)
-
-    # sequences alignment
-    # iterate the matrix's values from back to forward
-    char_pred = len(prediction)
-    char_ref = len(reference)
-    while char_pred > 0 and char_ref > 0:
-        diagonal = distance[char_pred - 1, char_ref - 1]
-        upper = distance[char_pred, char_ref - 1]
-        left = distance[char_pred - 1, char_ref]
-
-        # check back direction
-        direction = "\\" if diagonal <= upper and \
-                            diagonal <= left else "<-" \
-            if left < diagonal and \
-               left <= upper else "^"
-        char_pred = char_pred - 1 if direction == "<-" or direction == "\\" else char_pred
-        char_ref = char_ref - 1 if direction == "^" or direction == "\\" else char_ref
-
+    # compute distance (prediction in rows, reference in columns)
+    # and align the sequences from the end of the matrix
+    for operation, char_pred, char_ref in alignment_operations(prediction, reference, max_cells):
         # Colorize characters with HTML tags
-        if (direction == "\\"):
-            if distance[char_pred + 1, char_ref + 1] == diagonal:
-                result.append(f"<span style='color:#3CB371'>{prediction[char_pred]}</span>")
-            elif distance[char_pred + 1, char_ref + 1] > diagonal:
-                result.append(f"<span style='color:#D2122E'>{reference[char_ref]}</span>")
-                result.append(f"<span style='color:#4169E1'>{prediction[char_pred]}</span>")
-            else:
-                result.append(f"<span style='color:#4169E1'>{prediction[char_pred]}</span>")
-                result.append(f"<span style='color:#D2122E'>{reference[char_ref]}</span>")
-        elif (direction == "<-"):
+        if operation == 'equal':
+            result.append(f"<span style='color:#3CB371'>{prediction[char_pred]}</span>")
+        elif operation == 'replace':
+            result.append(f"<span style='color:#4169E1'>{prediction[char_pred]}</span>")
+            result.append(f"<span style='color:#D2122E'>{reference[char_ref]}</span>")
+        elif operation == 'delete':
             result.append(f"<span style='color:#4169E1'>{prediction[char_pred]}</span>")
-        elif (direction == "^"):
+        else:
             result.append(f"<span style='color:#D2122E'>{reference[char_ref]}</span>")
 
-    # reverse the list of result
-    return result[::-1]
+    return result
+
+
+def ndiff_characters_steps(reference: str, prediction: str) -> tuple:
+    """returns the characters kept, deleted and inserted by difflib.ndiff()
+    on two sequences of characters, in the same order.
+
+    Note
+    ----
+    ndiff() gets the opcodes of SequenceMatcher, then for each replaced block
+    compares all the pairs of characters to find a similar pair
+    (quadratic). Two different characters are never similar : the block is
+    synchronized on its first identical pair (first predicted character found
+    in the reference block), the characters before are deleted and inserted
+    (shortest block first), and so on after the pair. Here, the identical
+    pair is found with the sorted positions of each reference character.
+
+    Example
+    --------
+    >>> ndiff_characters_steps("chat", "chant")
+    (['c', 'h', 'a', 't'], [], ['n'])
+
+    Args:
+        reference (str): reference sequence
+        prediction (str): prediction sequence
+
+    Returns:
+        tuple: lists of characters kept, deleted and inserted
+    """
+    exact, deleted, inserted = [], [], []
+
+    def plain_replace(alo: int, ahi: int, blo: int, bhi: int) -> None:
+        if bhi - blo < ahi - alo:
+            inserted.extend(prediction[blo:bhi])
+            deleted.extend(reference[alo:ahi])
+        else:
+            deleted.extend(reference[alo:ahi])
+            inserted.extend(prediction[blo:bhi])
+
+    positions = None
+    matcher = difflib.SequenceMatcher(None, reference, prediction)
+    for tag, alo, ahi, blo, bhi in matcher.get_opcodes():
+        if tag == 'equal':
+            exact.extend(reference[alo:ahi])
+        elif tag == 'delete':
+            deleted.extend(reference[alo:ahi])
+        elif tag == 'insert':
+            inserted.extend(prediction[blo:bhi])
+        else:
+            if positions is None:
+                positions = defaultdict(list)
+                for index, char in enumerate(reference):
+                    positions[char].append(index)
+            while alo < ahi and blo < bhi:
+                # first identical pair of the block
+                for index_b in range(blo, bhi):
+                    char_positions = positions.get(prediction[index_b], ())
+                    rank = bisect.bisect_left(char_positions, alo)
+                    if rank < len(char_positions) and char_positions[rank] < ahi:
+                        index_a = char_positions[rank]
+                        break
+                else:
+                    plain_replace(alo, ahi, blo, bhi)
+                    alo, blo = ahi, bhi
+                    break
+                # no identical pair before the synch point
+                if alo < index_a and blo < index_b:
+                    plain_replace(alo, index_a, blo, index_b)
+                else:
+                    deleted.extend(reference[alo:index_a])
+                    inserted.extend(prediction[blo:index_b])
+                exact.append(reference[index_a])
+                alo, blo = index_a + 1, index_b + 1
+            deleted.extend(reference[alo:ahi])
+            inserted.extend(prediction[blo:bhi])
+    return exact, deleted, inserted
 
 
 class RecognizerTypeFiles:
@@ -318,7 +374,8 @@ def lev_distance(reference: str, hypothesis: str) -> list:
         ----
         based on WER-in-python program (Github @zszyellow)
         more informations : Algorithm implementation of Levenshtein distance
-        in Wikibooks
+        in Wikibooks. The matrix is computed row by row with NumPy
+        (see STS_Tools.STSAlign.levenshtein_matrix())
 
         Example
         -------
@@ -337,39 +394,25 @@ def lev_distance(reference: str, hypothesis: str) -> list:
         Returns:
             list : sparse matrix
         """
-    distance = np.zeros((len(reference) + 1) * (len(hypothesis) + 1), dtype=np.uint8).reshape \
-        ((len(reference) + 1, len(hypothesis) + 1))
-    for i in range(len(reference) + 1):
-        distance[i][0] = i
-    for j in range(len(hypothesis) + 1):
-        distance[0][j] = j
-    for i in range(1, len(reference) + 1):
-        for j in range(1, len(hypothesis) + 1):
-            if reference[i - 1] == hypothesis[j - 1]:
-                distance[i][j] = distance[i - 1][j - 1]
-            else:
-                substitute = distance[i - 1][j - 1] + 1
-                insert = distance[i][j - 1] + 1
-                delete = distance[i - 1][j] + 1
-                distance[i][j] = min(substitute, insert, delete)
-    return distance
+    return levenshtein_matrix(reference, hypothesis)
 
 class FilesToMetrics(RecognizerTypeFiles):
     """A child class of different kinds of edit distance
     * matrix
     * int
-    uses for differents type of syntaxics metrics
+    uses for differents type of syntaxics metrics,
+    each distance is computed on first access, once, on the tokens
+    of RecognizerTypeFiles (the matrix is never kept)
 
     Attributes:
         source (str) : reference sequence
         prediction (str) : prediction sequence
-        group_to_distance (object) : RecognizerTypeFiles object
         edit_distance_words_matrix (list) : edit distance use dynamic programming
             algorithm based on numpy
         edit_distance_char_int (list) : edit distance use classic
-            algorithm characters based - kraken function
+            algorithm characters based - bit-parallel (STSAlign)
         edit_distance_word_int (list) : edit distance use classic
-            algorithm words tokens based  - kraken function
+            algorithm words tokens based - bit-parallel (STSAlign)
     """
 
     def __init__(self, source: str, prediction: str, image: str, *args: bool) -> None:
@@ -385,37 +428,48 @@ class FilesToMetrics(RecognizerTypeFiles):
             *args (bool, optional) : activate clean text mode
         """
         RecognizerTypeFiles.__init__(self, source, prediction, image, *args)
-        self.source = source
-        self.prediction = prediction
-        self.group_to_distance = RecognizerTypeFiles(source, prediction, image, *args)
-        self.edit_distance_words_matrix = lev_distance(self.group_to_distance.source_tokens_words,
-                                                       self.group_to_distance.pred_tokens_words)
-        self.edit_distance_char_int = _fast_levenshtein(self.group_to_distance.source_tokens_char,
-                                                        self.group_to_distance.pred_tokens_char)
-        self.edit_distance_word_int = _fast_levenshtein(self.group_to_distance.source_tokens_words,
-                                                        self.group_to_distance.pred_tokens_words)
+
+    @property
+    def edit_distance_words_matrix(self):
+        """edit distance matrix words tokens based, computed on each
+        access (not kept in memory, O(n*m))"""
+        return lev_distance(self.source_tokens_words, self.pred_tokens_words)
+
+    @LazyProperty
+    def edit_distance_char_int(self):
+        """edit distance characters tokens based (computed once)"""
+        return levenshtein_distance(self.source_tokens_char, self.pred_tokens_char)
+
+    @LazyProperty
+    def edit_distance_word_int(self):
+        """edit distance words tokens based (computed once)"""
+        return levenshtein_distance(self.source_tokens_words, self.pred_tokens_words)
 
 
 class TranscriptionMetricsTools(FilesToMetrics):
-    """A child class for elaborate metrics on transcription model
+    """A child class for elaborate metrics on transcription model,
+    the tokens and distances of FilesToMetrics are shared (computed once).
+    The distances and similarities are computed on first access only.
 
     Attributes:
-        group_to_metrics (object) : FilesToMetrics object
         source (str) : reference sequence
         prediction (str) : prediction sequence
         distance_matrix_words (list) : edit distance use dynamic programming
-            algorithm based on numpy
+            algorithm based on numpy (computed on each access, not kept in memory)
         distance_int_char (int) : edit distance use classic
-            algorithm characters tokens based - kraken function
+            algorithm characters tokens based - bit-parallel (STSAlign)
         distance_int_word (int) : edit distance use classic
-            algorithm words tokens based - kraken function
+            algorithm words tokens based - bit-parallel (STSAlign)
         reference_tokens_words (list) : reference words tokens-based (optionnal with clean text)
         hypothesis_tokens_words (list) : prediction words tokens-based (optionnal with clean text)
         reference_tokens_char (list) : reference char tokens-based (optionnal with clean text)
         hypothesis_tokens_char (list) : prediction char tokens-based (optionnal with clean text)
-        stop_words (list) : list of stop words. define language in constructor method
+        stop_words (frozenset) : stop words of the language defined in constructor method (see get_stop_words())
         get_sequence_stop (function) : supress words stops on the fly
         edit_distance_levensthein (int) : edit distance compute with Levensthein lib (C extension)
+        hamming_distance (int) : Hamming distance (Ø if sequences have not the same length)
+        jaccard_similarity (float) : Jaccard index
+        cosine_similarity (float) : cosine similarity
 
     """
     def __init__(self,
@@ -435,44 +489,69 @@ class TranscriptionMetricsTools(FilesToMetrics):
             language (str) : language use to compute stop words. Defaults on 'french'
         """
         FilesToMetrics.__init__(self, source, prediction, image, *args)
-        self.group_to_metrics = FilesToMetrics(source, prediction, image, *args)
-
-        self.source = source
-        self.prediction = prediction
 
-        self.distance_matrix_words = self.group_to_metrics.edit_distance_words_matrix
-        self.distance_int_char = self.group_to_metrics.edit_distance_char_int
-        self.distance_int_word = self.group_to_metrics.edit_distance_word_int
+        self.reference_tokens_words = self.source_tokens_words
+        self.hypothesis_tokens_words = self.pred_tokens_words
 
-        self.reference_tokens_words = self.group_to_metrics.source_tokens_words
-        self.hypothesis_tokens_words = self.group_to_metrics.pred_tokens_words
-
-        self.reference_tokens_char = self.group_to_metrics.source_tokens_char
-        self.hypothesis_tokens_char = self.group_to_metrics.pred_tokens_char
+        self.reference_tokens_char = self.source_tokens_char
+        self.hypothesis_tokens_char = self.pred_tokens_char
 
         # Pre-processing text data tools for semantic similarity metrics
 
-        self.stop_words = set(stopwords.words(language))
+        self.stop_words = get_stop_words(language)
 
         self.get_sequence_stop = lambda text: \
             [token
              for token in text
              if not token in self.stop_words]
 
-        # SYNTACTIC SIMILARITY METRICS #
-
-        self.edit_distance_levensthein = distance(self.source, self.prediction)
-
+    # SYNTACTIC SIMILARITY METRICS #
+    # the distances are computed on first access only (see LazyProperty)
+
+    @property
+    def distance_matrix_words(self):
+        """edit distance matrix words tokens based (not kept in memory)"""
+        return self.edit_distance_words_matrix
+
+    @property
+    def distance_int_char(self):
+        """edit distance characters tokens based"""
+        return self.edit_distance_char_int
+
+    @property
+    def distance_int_word(self):
+        """edit distance words tokens based"""
+        return self.edit_distance_word_int
+
+    @property
+    def reference_total_char(self):
+        """number of characters tokens of the reference"""
+        return len(self.reference_tokens_char)
+
+    @property
+    def reference_total_word(self):
+        """number of words tokens of the reference"""
+        return len(self.reference_tokens_words)
+
+    @LazyProperty
+    def edit_distance_levensthein(self):
+        """edit distance compute with Levensthein lib (C extension)"""
+        return distance(self.source, self.prediction)
+
+    @LazyProperty
+    def hamming_distance(self):
+        """Hamming distance with Levensthein C extension,
+        Ø if sequences have not the same length"""
+        try:
+            return hamming(self.source, self.prediction)
+        except:
+            return 'Ø'
 
     def _hamming_distance(self):
         """compute the Hamming distance with Levensthein C extension.
         returns Ø if no score => sequences have not the same length
         """
-        try:
-            edit_hamming_distance = hamming(self.source, self.prediction)
-            return edit_hamming_distance
-        except:
-            return 'Ø'
+        return self.hamming_distance
 
     def _calculate_wer(self):
         """returns Word Error Rate
@@ -536,6 +615,12 @@ class TranscriptionMetricsTools(FilesToMetrics):
     # Jaccard index
 
     def get_jaccard_similarity(self):
+        """returns the jaccard index, see jaccard_similarity
+        """
+        return self.jaccard_similarity
+
+    @LazyProperty
+    def jaccard_similarity(self):
         """computes the jaccard index
         J(A,B) = |A ∩ B| / |A u B|
 
@@ -543,9 +628,15 @@ class TranscriptionMetricsTools(FilesToMetrics):
         -------------------
         * use normalize()
         * delete stop words
+
+        Two texts without any word (blank pages or stop words only)
+        are identical : J = 1.0
         """
         sentence_reference = set(self.get_sequence_stop(normalize(self.source)))
         sentence_prediction = set(self.get_sequence_stop(normalize(self.prediction)))
+        # empty union : no division by zero in the workers of the metrics stage
+        if not sentence_reference and not sentence_prediction:
+            return 1.0
         # compares the words the most words in common
         inter_ref_pred = sentence_reference.intersection(sentence_prediction)
         # return the formula of jaccard index
@@ -561,6 +652,12 @@ class TranscriptionMetricsTools(FilesToMetrics):
     # Cosine similarity
 
     def get_cosine_sim(self):
+        """returns the cosine similarity, see cosine_similarity
+        """
+        return self.cosine_similarity
+
+    @LazyProperty
+    def cosine_similarity(self):
         """compute cosine similarity
         cosine similarity = (A.B)/(||A||*||B||)
 
@@ -614,6 +711,83 @@ class TranscriptionMetricsTools(FilesToMetrics):
             return truncate(float(numerator) / denominator)
 
 
+class TranscriptionMetricsRecord:
+    """Compact and picklable results of a TranscriptionMetricsTools object :
+    the texts, the distances and the similarities, without the tokens.
+    Built in the worker processes of the metrics stage (see from_metrics()),
+    it answers the same calls as TranscriptionMetricsTools in the report.
+
+    Attributes:
+        source (str) : reference sequence
+        prediction (str) : prediction sequence
+        image (str) : path to image
+        name_image (str) : basename image
+        canevas_image (str) : html canevas for rendering image
+        distance_int_char (int) : edit distance characters tokens based
+        distance_int_word (int) : edit distance words tokens based
+        reference_total_char (int) : number of characters tokens of the reference
+        reference_total_word (int) : number of words tokens of the reference
+        edit_distance_levensthein (int) : edit distance compute with Levensthein lib
+        hamming_distance (int) : Hamming distance (Ø if sequences have not the same length)
+        jaccard_similarity (float) : Jaccard index
+        cosine_similarity (float) : cosine similarity
+    """
+
+    __slots__ = ('source', 'prediction', 'image', 'name_image', 'canevas_image',
+                 'distance_int_char', 'distance_int_word',
+                 'reference_total_char', 'reference_total_word',
+                 'edit_distance_levensthein', 'hamming_distance',
+                 'jaccard_similarity', 'cosine_similarity')
+
+    def __init__(self, **values) -> None:
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def from_metrics(cls, metrics: TranscriptionMetricsTools) -> 'TranscriptionMetricsRecord':
+        """computes all the metrics of a TranscriptionMetricsTools object
+
+        Args:
+            metrics (TranscriptionMetricsTools): metrics of a page
+
+        Returns:
+            TranscriptionMetricsRecord: results of the page
+        """
+        return cls(**{name: getattr(metrics, name) for name in cls.__slots__})
+
+    def _hamming_distance(self):
+        """returns the Hamming distance, Ø if sequences have not the same length"""
+        return self.hamming_distance
+
+    def _calculate_wer(self):
+        """returns Word Error Rate, see TranscriptionMetricsTools"""
+        return truncate(float(self.distance_int_word / self.reference_total_word))
+
+    def _calculate_wer_percent(self):
+        """returns Word Error Rate in percent"""
+        return truncate(float(self.distance_int_word / self.reference_total_word) * 100)
+
+    def _calculate_word_accuracy(self):
+        """returns word accuracy in percent"""
+        return int((1 - float(self.distance_int_word / self.reference_total_word)) * 100)
+
+    def _calculate_cer(self):
+        """returns Character Error Rate, see TranscriptionMetricsTools"""
+        return truncate(float(self.distance_int_char / self.reference_total_char))
+
+    def _calculate_cer_percent(self):
+        """returns Character Error rate in percent"""
+        return truncate(float(self.distance_int_char / self.reference_total_char) * 100)
+
+    def get_jaccard_similarity(self):
+        """returns the jaccard index"""
+        return self.jaccard_similarity
+
+    def get_cosine_sim(self):
+        """returns the cosine similarity"""
+        return self.cosine_similarity
+
+
 class VisualSynTS():
     """A class for plot the syntatic similarity
 
@@ -666,16 +840,22 @@ class VisualSynTS():
             * char in prediction
             * number of occurences of this confusion pair
 
+            Note
+            ----
+            the insertions have the empty character (ε) as reference char
+            and the deletions as predicted char ; a real ε of the texts
+            keeps its operation (e.g. ('delete', 'ε', 'ε') for its deletion)
+
             Example
             -------
             >>> ref = "Oh le beau bateau"
             >>> pred =  "Oh le belle avion"
             >>> edit_pos = editops(ref, pred)
-            >>> get_pair_char_errors_max_occurences()
-            [(('replace', 'a', 'l'), 1), (('replace', 'u', 'l'), 1),
-            (('replace', ' ', 'e'), 1), (('replace', 'b', ' '), 1),
-            (('replace', 't', 'v'), 1), (('replace', 'e', 'i'), 1),
-            (('replace', 'a', 'o'), 1), (('replace', 'u', 'n'), 1)]
+            >>> get_pair_char_errors_max_occurences(ref, pred, edit_pos)
+            [(('insert', 'ε', 'l'), 1), (('replace', 'a', 'l'), 1),
+            (('replace', 'a', 'o'), 1), (('delete', 'b', 'ε'), 1),
+            (('replace', 'e', 'i'), 1), (('replace', 't', 'v'), 1),
+            (('replace', 'u', 'e'), 1), (('replace', 'u', 'n'), 1)]
 
             Args:
                 reference (str): reference sentence
@@ -685,40 +865,11 @@ class VisualSynTS():
             Returns:
                 list : pair of char errors (type, char in reference, char in prediction, occurences)
             """
-            list_step = []
-            for group in edit_positions:
-                for item in group:
-                    # we get each modification in the list
-                    if item == "replace" or item == "insert" or item == "delete" or item == "equal":
-                        list_step.append(item)
-                    else:
-                        # we replace the position of the characters in the reference
-                        # sentence and in the target sentence with the characters
-                        # themselves via the index
-                        if len(reference) != 0:
-                            try:
-                                list_step.append(reference[item])
-                            except IndexError:
-                                break
-                        if len(hypothesis) != 0:
-                            try:
-                                list_step.append(hypothesis[item])
-                            except IndexError:
-                                break
-                        break
-
-            # create a dictionnary with a key as tuples of three items
-            # from list_step for retrieve type transformation,
-            # char in reference and char in prediction
-            # and with value as a number of occurences of this key.
-            # After we reshape the dictionnary into a list contaning
-            # a tuple that contains tuple of three elements
-            # more the number of occurences.
-            pair_errors = Counter(list(zip(list_step[::3],
-                                           list_step[1::3],
-                                           list_step[2::3]))).most_common()
-
-            return pair_errors
+            # each operation (op, spos, dpos) is mapped to (ref[spos], hyp[dpos])
+            # at once and counted in a confusion matrix of the page
+            confusion = ConfusionAccumulator()
+            confusion.add(reference, hypothesis, edit_positions)
+            return confusion.top_k(len(edit_positions))
 
         self.pair_char_errors_max_occurences = \
             get_pair_char_errors_max_occurences(self.source,
@@ -806,7 +957,7 @@ class VisualSynTS():
         # attributes for Ratcliff_Obershelp visualizations
 
         def Ratcliff_Obershelp_steps(source: str, prediction: str) -> list:
-            """compute with the Ratcliff / Obershelp algorithm, via difflib,
+            """compute with the Ratcliff / Obershelp algorithm, as difflib.ndiff(),
             a list of characters actually recognized, a list of tuple containing
             the deleted characters and the number of times they have been deleted
             and a list of tuples containing the inserted characters and the number
@@ -834,30 +985,9 @@ class VisualSynTS():
                     list: list of tuples deletions and occurences
                     list: list of tuples insertions and occurences
             """
-            # creation of a data structure associating
-            # the reference sentence and the prediction sentence
-            cases = [(source, prediction)]
-
-            # creation of empty lists to recover exactly
-            # recognized, deleted and added characters
-            list_exact = []
-            list_char_delete = []
-            list_char_add = []
-
-            for reference, prediction in cases:
-                # difflib tokenize the sentence in characters,
-                # here we use the intact sequences which not
-                # not subjected to cleaning (we keep punctuation, spaces ...)
-                for position, char in enumerate(difflib.ndiff(reference, prediction)):
-                    # cases common to both sequences
-                    if char[0] == ' ':
-                        list_exact.append(char[-1])
-                    # cases of deletions
-                    elif char[0] == '-':
-                        list_char_delete.append(char[-1])
-                    # cases of insert
-                    elif char[0] == '+':
-                        list_char_add.append(char[-1])
+            # same steps as difflib.ndiff() without its quadratic
+            # intraline pass (see ndiff_characters_steps())
+            list_exact, list_char_delete, list_char_add = ndiff_characters_steps(source, prediction)
 
             number_deletions = Counter(list_char_delete).most_common()
             number_add = Counter(list_char_add).most_common()
@@ -948,6 +1078,10 @@ class VisualSynTS():
             ValueError: if len(df_cm) == 0
 
         """
+        # plotting packages are imported on first figure only
+        import matplotlib.pyplot as plt
+        import pandas as pd
+        import seaborn as sn
 
         try:
             # dataset
@@ -1008,6 +1142,7 @@ class VisualSynTS():
             display_html (bool) : if open on html or in prompt.
             Defaults on True
         """
+        import matplotlib.pyplot as plt
 
         fig_hist, axes = plt.subplots()
 
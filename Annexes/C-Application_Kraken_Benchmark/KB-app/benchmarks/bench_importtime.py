@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK IMPORT TIME BENCHMARK
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+measure the cold-start time of the STS Tools modules with
+`python -X importtime`, each import in a new interpreter, and list
+the heavy packages (plotting stack, NLTK) loaded by the import.
+
+    $ python benchmarks/bench_importtime.py --output importtime.json
+    $ python benchmarks/bench_importtime.py --module STS_Tools.STSig
+
+Run it from the KB-app directory.
+"""
+
+# built-in packages
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+KB_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# packages which should not be loaded by the metrics core
+HEAVY_PACKAGES = ('matplotlib', 'nltk', 'pandas', 'seaborn', 'kraken', 'torch')
+
+
+def import_module(module: str) -> tuple:
+    """import a module in a new interpreter with -X importtime
+
+    Args:
+        module (str): dotted name of the module
+
+    Returns:
+        tuple: cumulative import times in microseconds by module (dict)
+            and heavy packages loaded (list)
+    """
+    code = (f"import sys, {module}; "
+            f"print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))")
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                             cwd=KB_APP_DIR,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             universal_newlines=True,
+                             check=True)
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cumulative_us)
+    loaded = [package for package in process.stdout.strip().split(",") if package]
+    return cumulative, loaded
+
+
+def run_benchmark(module: str, repeat: int, top: int) -> dict:
+    """measure the cold-start time of a module
+
+    Args:
+        module (str): dotted name of the module
+        repeat (int): number of interpreters launched
+        top (int): number of slowest top-level imports to keep
+
+    Returns:
+        dict: best and median import times in milliseconds, slowest
+            top-level imports of the last run and heavy packages loaded
+    """
+    timings = []
+    for _ in range(repeat):
+        cumulative, loaded = import_module(module)
+        timings.append(cumulative[module] / 1000)
+    top_level = {name: us / 1000 for name, us in cumulative.items()
+                 if "." not in name and name != module.split(".")[0]}
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {'module': module,
+            'repeat': repeat,
+            'best_ms': min(timings),
+            'median_ms': statistics.median(timings),
+            'slowest_ms': dict(slowest),
+            'heavy_packages': loaded}
+
+
+def main() -> None:
+    """launch the benchmark and print the results
+    """
+    parser = argparse.ArgumentParser(description="measure the cold-start time "
+                                                 "of the STS Tools modules")
+    parser.add_argument('--module', action='append', default=None,
+                        help='module to import, can be repeated '
+                             '(default = STS_Tools.SynSemTS)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of interpreters launched (default = 5)')
+    parser.add_argument('--top', type=int, default=8,
+                        help='number of slowest imports displayed (default = 8)')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = [run_benchmark(module, args.repeat, args.top)
+               for module in (args.module or ['STS_Tools.SynSemTS'])]
+    for result in results:
+        print(f"{result['module']} | best {result['best_ms']:.1f} ms | "
+              f"median {result['median_ms']:.1f} ms | "
+              f"heavy packages : {', '.join(result['heavy_packages']) or 'none'}")
+        for name, milliseconds in result['slowest_ms'].items():
+            print(f"    {name:<24} {milliseconds:>8.1f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK METRICS BENCHMARK
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+time the metrics of each page of the dataset_GT sample as the metrics
+stage of kraken_benchmark.py computes them : TranscriptionMetricsTools
+object and all its metrics (distances, CER, WER, similarities) collected
+in a TranscriptionMetricsRecord. The metrics being lazy properties, the
+construction of the object alone computes nothing.
+
+No prediction is stored with the sample : each prediction is the ground
+truth with seeded random edits (about 5 % of the characters substituted,
+deleted or inserted).
+
+To compare before and after a change, run the benchmark on both trees
+and keep the JSON results :
+
+    $ python benchmarks/bench_metrics.py --output before.json   (previous commit)
+    $ python benchmarks/bench_metrics.py --output after.json    (current tree)
+
+Run it from the KB-app directory.
+"""
+
+# built-in packages
+import argparse
+import glob
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# local packages
+from STS_Tools.SynSemTS import TranscriptionMetricsRecord, TranscriptionMetricsTools  # noqa: E402
+
+
+def add_noise(text: str, rate: float = 0.05, seed: int = 0) -> str:
+    """simulate a prediction with random edits of the characters
+
+    Args:
+        text (str): ground truth text
+        rate (float, optional): probability of an edit by character. Defaults to 0.05
+        seed (int, optional): seed of the random generator. Defaults to 0
+
+    Returns:
+        str: noisy text
+    """
+    generator = random.Random(seed)
+    characters = []
+    for char in text:
+        draw = generator.random()
+        if draw < rate / 3:
+            continue
+        if draw < 2 * rate / 3:
+            characters.append(generator.choice("aeiourstnl "))
+        elif draw < rate:
+            characters.extend([char, generator.choice("aeiourstnl ")])
+        else:
+            characters.append(char)
+    return "".join(characters)
+
+
+def run_benchmark(gt_dir: str, repeat: int, clean_text: bool) -> dict:
+    """time the metrics of each page (object and record of all its metrics)
+
+    Args:
+        gt_dir (str): directory of the ground truth texts
+        repeat (int): number of runs by page
+        clean_text (bool): activate clean text mode
+
+    Returns:
+        dict: per-page timings (best and median in milliseconds) and totals
+    """
+    pages = {}
+    for index, path in enumerate(sorted(glob.glob(os.path.join(gt_dir, "*.txt")))):
+        with open(path, "r", encoding="utf-8") as file:
+            reference = file.read()
+        prediction = add_noise(reference, seed=index)
+        args = (clean_text,) if clean_text else ()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            TranscriptionMetricsRecord.from_metrics(
+                TranscriptionMetricsTools(reference, prediction, path, *args))
+            timings.append((time.perf_counter() - start) * 1000)
+        pages[os.path.basename(path)] = {'characters': len(reference),
+                                         'best_ms': min(timings),
+                                         'median_ms': statistics.median(timings)}
+    return {'repeat': repeat,
+            'clean_text': clean_text,
+            'pages': pages,
+            'total_best_ms': sum(page['best_ms'] for page in pages.values()),
+            'total_median_ms': sum(page['median_ms'] for page in pages.values())}
+
+
+def main() -> None:
+    """launch the benchmark and print the results
+    """
+    parser = argparse.ArgumentParser(description="time the metrics of the pages "
+                                                 "of the dataset_GT sample")
+    parser.add_argument('--gt_dir', default='dataset_GT',
+                        help='directory of the ground truth texts (default = dataset_GT)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of runs by page (default = 5)')
+    parser.add_argument('--clean_text', action='store_true',
+                        help='activate clean text mode')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.gt_dir, args.repeat, args.clean_text)
+    for name, page in results['pages'].items():
+        print(f"{name:<12} {page['characters']:>6} chars | "
+              f"best {page['best_ms']:>9.2f} ms | median {page['median_ms']:>9.2f} ms")
+    print(f"{'total':<12} {'':>6}       | "
+          f"best {results['total_best_ms']:>9.2f} ms | median {results['total_median_ms']:>9.2f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
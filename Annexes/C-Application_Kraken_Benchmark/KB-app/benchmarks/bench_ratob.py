@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK RATCLIFF/OBERSHELP STEPS BENCHMARK
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+time the Ratcliff/Obershelp steps (characters kept, deleted and inserted)
+with difflib.ndiff() and with ndiff_characters_steps() on pages of 1k, 5k
+and 20k characters, and check that both give the same steps. The pages
+are the dataset_GT texts put end to end (repeated if needed), the
+predictions have seeded random edits (see bench_metrics.add_noise()).
+
+    $ python benchmarks/bench_ratob.py --output ratob.json
+    $ python benchmarks/bench_ratob.py --sizes 1000 5000 --rates 0.05 0.3 0.6
+
+Run it from the KB-app directory.
+"""
+
+# built-in packages
+import argparse
+import difflib
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# local packages
+from benchmarks.bench_metrics import add_noise  # noqa: E402
+from STS_Tools.SynSemTS import ndiff_characters_steps  # noqa: E402
+
+
+def ndiff_steps(reference: str, prediction: str) -> tuple:
+    """characters kept, deleted and inserted read from difflib.ndiff()"""
+    exact, deleted, inserted = [], [], []
+    for line in difflib.ndiff(reference, prediction):
+        if line[0] == ' ':
+            exact.append(line[-1])
+        elif line[0] == '-':
+            deleted.append(line[-1])
+        elif line[0] == '+':
+            inserted.append(line[-1])
+    return exact, deleted, inserted
+
+
+def time_function(function, reference: str, prediction: str, repeat: int) -> tuple:
+    """time a function of the steps
+
+    Returns:
+        tuple: steps and median duration in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        steps = function(reference, prediction)
+        timings.append((time.perf_counter() - start) * 1000)
+    return steps, statistics.median(timings)
+
+
+def run_benchmark(gt_dir: str, sizes: list, rates: list, repeat: int) -> list:
+    """compare difflib.ndiff() and ndiff_characters_steps()
+
+    Args:
+        gt_dir (str): directory of the ground truth texts
+        sizes (list): number of characters of the pages
+        rates (list): probabilities of an edit by character
+        repeat (int): number of runs by page
+
+    Returns:
+        list: size, rate and median durations of each page
+    """
+    text = ""
+    for path in sorted(glob.glob(os.path.join(gt_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as file:
+            text += file.read()
+    if not text:
+        sys.exit(f"no text in {gt_dir}")
+
+    results = []
+    for size in sizes:
+        reference = (text * (size // len(text) + 1))[:size]
+        for rate in rates:
+            prediction = add_noise(reference, rate=rate, seed=size)
+            steps_ndiff, ndiff_ms = time_function(ndiff_steps, reference, prediction, repeat)
+            steps, steps_ms = time_function(ndiff_characters_steps, reference, prediction, repeat)
+            if steps != steps_ndiff:
+                sys.exit(f"steps differ for {size} characters, rate {rate}")
+            results.append({'characters': size,
+                            'rate': rate,
+                            'ndiff_ms': ndiff_ms,
+                            'steps_ms': steps_ms})
+    return results
+
+
+def main() -> None:
+    """launch the benchmark and print the results
+    """
+    parser = argparse.ArgumentParser(description="compare difflib.ndiff() and "
+                                                 "ndiff_characters_steps()")
+    parser.add_argument('--gt_dir', default='dataset_GT',
+                        help='directory of the ground truth texts (default = dataset_GT)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000],
+                        help='number of characters of the pages (default = 1000 5000 20000)')
+    parser.add_argument('--rates', type=float, nargs='+', default=[0.05, 0.3],
+                        help='probabilities of an edit by character (default = 0.05 0.3)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs by page (default = 3)')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.gt_dir, args.sizes, args.rates, args.repeat)
+    for result in results:
+        print(f"{result['characters']:>6} chars | rate {result['rate']:.2f} | "
+              f"ndiff {result['ndiff_ms']:>10.2f} ms | "
+              f"steps {result['steps_ms']:>8.2f} ms | "
+              f"x{result['ndiff_ms'] / result['steps_ms']:.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK TOKENIZER BENCHMARK
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+time the tokenization of the dataset_GT sample with the NLTK path
+(regexp_tokenize() and clean_text() building its translation table at
+each call) and with STS_Tools.STSTokenize, and check that both give
+the same tokens, with and without the clean text option.
+
+    $ python benchmarks/bench_tokenize.py --output tokenize.json
+
+Run it from the KB-app directory.
+"""
+
+# built-in packages
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+
+# external packages
+from nltk.tokenize import regexp_tokenize
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# local packages
+from STS_Tools.STSTokenize import characters_codes, tokenizer  # noqa: E402
+
+
+def nltk_clean_text(text: str) -> str:
+    """clean text steps of the NLTK path"""
+    text = text.replace("\n", "").replace("\r", " ")
+    punc_list = '!"#$%&()*+,-—./:;<=>«»?@[\\]^_{|}~\'`’' + '0123456789'
+    text_without_punct = str.maketrans(dict.fromkeys(punc_list, ""))
+    return text.translate(text_without_punct)
+
+
+def nltk_tokenizer(sentence: str, *args: bool) -> tuple:
+    """words and characters cutouts of the NLTK path"""
+    if args:
+        sentence = nltk_clean_text(sentence)
+    return (regexp_tokenize(sentence, pattern=r'\W', gaps=True),
+            regexp_tokenize(sentence, pattern='', gaps=True))
+
+
+def time_function(function, texts: list, args: tuple, repeat: int) -> dict:
+    """time the tokenization of all the texts
+
+    Args:
+        function (function): tokenizer to time
+        texts (list): texts to tokenize
+        args (tuple): clean text option given to the tokenizer
+        repeat (int): number of runs
+
+    Returns:
+        dict: best and median durations of a run in milliseconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            function(text, *args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {'best_ms': min(timings), 'median_ms': statistics.median(timings)}
+
+
+def run_benchmark(gt_dir: str, repeat: int) -> dict:
+    """compare the NLTK path and STSTokenize on the ground truth texts
+
+    Args:
+        gt_dir (str): directory of the ground truth texts
+        repeat (int): number of runs
+
+    Returns:
+        dict: timings of both tokenizers by mode and size of the tokens
+    """
+    texts = []
+    for path in sorted(glob.glob(os.path.join(gt_dir, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as file:
+            texts.append(file.read())
+
+    results = {'texts': len(texts),
+               'characters': sum(len(text) for text in texts),
+               'repeat': repeat,
+               'modes': {}}
+    for mode, args in (('raw', ()), ('clean_text', (True,))):
+        for text in texts:
+            if nltk_tokenizer(text, *args) != tokenizer(text, *args):
+                sys.exit(f"tokens differ in {mode} mode")
+        results['modes'][mode] = {'nltk': time_function(nltk_tokenizer, texts, args, repeat),
+                                  'ststokenize': time_function(tokenizer, texts, args, repeat)}
+
+    # size of the characters tokens : list of str versus code points
+    results['characters_list_bytes'] = sum(sys.getsizeof(list(text)) for text in texts)
+    results['characters_codes_bytes'] = sum(characters_codes(text).nbytes for text in texts)
+    return results
+
+
+def main() -> None:
+    """launch the benchmark and print the results
+    """
+    parser = argparse.ArgumentParser(description="compare the NLTK tokenization and "
+                                                 "STSTokenize on the dataset_GT sample")
+    parser.add_argument('--gt_dir', default='dataset_GT',
+                        help='directory of the ground truth texts (default = dataset_GT)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='number of runs (default = 20)')
+    parser.add_argument('--output', default=None,
+                        help='JSON file to save the results')
+    args = parser.parse_args()
+
+    results = run_benchmark(args.gt_dir, args.repeat)
+    print(f"{results['texts']} texts, {results['characters']} characters : same tokens")
+    for mode, timings in results['modes'].items():
+        speedup = timings['nltk']['median_ms'] / timings['ststokenize']['median_ms']
+        print(f"{mode:<12} | nltk median {timings['nltk']['median_ms']:>8.2f} ms | "
+              f"ststokenize median {timings['ststokenize']['median_ms']:>8.2f} ms | "
+              f"x{speedup:.1f}")
+    print(f"characters tokens : list {results['characters_list_bytes']} bytes, "
+          f"code points {results['characters_codes_bytes']} bytes")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
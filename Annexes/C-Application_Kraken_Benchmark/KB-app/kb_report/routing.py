@@ -16,9 +16,14 @@ Manage web-app side of Kraken-Benchmark
 """
 
 # built-in packages
+from collections import OrderedDict
 from datetime import datetime
+import getpass
 import io
+import multiprocessing
 import os
+import shutil
+import threading
 import uuid
 import webbrowser
 
@@ -31,15 +36,38 @@ plt.rcParams.update({'figure.max_open_warning': 0})
 
 # local packages
 from kb_utils.kb_utils import get_username, arrange_images_in_static
+from STS_Tools.STSConfusion import ConfusionAccumulator
+from STS_Tools.STSCorpus import BOOTSTRAP_RESAMPLES, CorpusMetrics
 from STS_Tools.SynSemTS import show_diff_color_html, VisualSynTS
-from STS_Tools.STSig import SequencesToSignals, PlotSTS
+from STS_Tools.STSig import SequencesToSignals, plot_signal_window
 
 
-def generate_html_report(metadata: list,
-                         model_name: str,
-                         list_statistics: list,
-                         images: list) -> None:
-    """generate a Flask application to display the results
+# templates and static files of the report
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+# default parameters of the sequences signals plot (see sequences_to_signals route)
+DEFAULT_SIGNALS_PARAMS = {'min_interval': 0,
+                          'max_interval': 70,
+                          'show_deltas': int(False),
+                          'error_boxes': int(True)}
+
+# maximum number of rendered figures kept by a report (least recently used dropped)
+PNG_CACHE_SIZE = 128
+
+# Flask application shared with the export workers (forked processes)
+_EXPORT_APP = None
+
+
+def create_app(metadata: list,
+               model_name: str,
+               list_statistics: list,
+               images: list,
+               username: str,
+               comparison: dict = None,
+               profile: dict = None) -> Flask:
+    """create the Flask application to display the results
     of the tests in differents HTML templates. Define routes here.
 
     Note
@@ -51,12 +79,16 @@ def generate_html_report(metadata: list,
         model_name (str): name of model
         list_statistics (list): list contains SynSemTS objects
         images (list): list of user's images
+        username (str): name of the user displayed on the report
+        comparison (dict, optional): name of model (key) and list contains
+            SynSemTS objects (value) if user compares several models
+        profile (dict, optional): stages statistics, throughput and peak memory
+            of the run (see kb_utils.kb_profile.RunProfile.to_dict())
+
+    Returns:
+        Flask: Kraken-Benchmark application
     """
 
-    # Alert message and name request :
-    os.popen("say -v Victoria Please, your name is required")
-    username = get_username()
-
     # Generate id from uuid and reduce the length of id :
     id_report = str(uuid.uuid1())[:8]
 
@@ -64,12 +96,65 @@ def generate_html_report(metadata: list,
     arrange_images_in_static(images)
 
     # Config app and manage directories
-    root = os.path.dirname(os.path.abspath(__file__))
-    templates_dir = os.path.join(root, 'templates')
-    statics = os.path.join(root, "static")
     app = Flask("Kraken-Benchmark",
-                template_folder=templates_dir,
-                static_folder=statics)
+                template_folder=TEMPLATES_DIR,
+                static_folder=STATIC_DIR)
+
+    # Per-report caches : analysis objects and versus texts by text id
+    # and rendered figures by route parameters, built on first request
+    visual_objects = {}
+    signals_objects = {}
+    png_cache = OrderedDict()
+    # the development server is threaded : a page requests several PNGs at once
+    png_cache_lock = threading.Lock()
+    diff_html = {}
+
+    # Corpus-level error rates (micro and macro averages), computed once. The
+    # bootstrap confidence intervals of the detailed model are computed on the
+    # first rendering of the report (see report()) and kept
+    corpus_metrics = CorpusMetrics.from_metrics(list_statistics)
+    corpus_comparison = {model_compared: CorpusMetrics.from_metrics(metrics_compared).summary()
+                         for model_compared, metrics_compared in (comparison or {}).items()}
+    corpus_confusion = ConfusionAccumulator()
+    for item in list_statistics:
+        corpus_confusion.add(item.source, item.prediction)
+
+    def get_visual_synts(number: int) -> VisualSynTS:
+        """returns the VisualSynTS object of a text, created once"""
+        if number not in visual_objects:
+            visual_objects[number] = VisualSynTS(list_statistics[number].source,
+                                                 list_statistics[number].prediction)
+        return visual_objects[number]
+
+    def get_sequences_to_signals(number: int) -> SequencesToSignals:
+        """returns the SequencesToSignals object of a text, created once"""
+        if number not in signals_objects:
+            signals_objects[number] = SequencesToSignals(list_statistics[number].source,
+                                                         list_statistics[number].prediction)
+        return signals_objects[number]
+
+    def png_response(key: tuple, make_figure) -> Response:
+        """render a figure in PNG once for the route parameters (key)
+        and serve it from the cache afterwards, the cache keeps the
+        PNG_CACHE_SIZE most recently used figures"""
+        with png_cache_lock:
+            png = png_cache.get(key)
+            if png is not None:
+                png_cache.move_to_end(key)
+        if png is not None:
+            return Response(png, mimetype="image/png")
+        # the figure is rendered outside the lock, the other requests are not blocked
+        figure = make_figure()
+        output = io.BytesIO()
+        FigureCanvasAgg(figure).print_png(output)
+        plt.close(figure)
+        png = output.getvalue()
+        with png_cache_lock:
+            png_cache[key] = png
+            png_cache.move_to_end(key)
+            if len(png_cache) > PNG_CACHE_SIZE:
+                png_cache.popitem(last=False)
+        return Response(png, mimetype="image/png")
 
     # Jinja filters on templates
     @app.template_filter('datetime_format')
@@ -89,6 +174,11 @@ def generate_html_report(metadata: list,
                                id=id_report,
                                name=username,
                                metrics=list_statistics,
+                               comparison=comparison,
+                               corpus=corpus_metrics.summary(resamples=BOOTSTRAP_RESAMPLES),
+                               corpus_comparison=corpus_comparison,
+                               corpus_confusions=corpus_confusion.top_k(10),
+                               profile=profile,
                                size_images=len(images))
 
     @app.route("/KB-notebook")
@@ -112,14 +202,10 @@ def generate_html_report(metadata: list,
         Args:
             number (int): number of reference and prediction texts to display figure associate
         """
-        synsemts_object = VisualSynTS(list_statistics[number].source,
-                                      list_statistics[number].prediction)
-        fig_1 = synsemts_object.plot_hist_ratob_steps(
-            title=f'Sequence to sequence steps details for image {number + 1}')
-        output_1 = io.BytesIO()
-        FigureCanvasAgg(fig_1).print_png(output_1)
-        return Response(output_1.getvalue(),
-                        mimetype="image/png")
+        synsemts_object = get_visual_synts(number)
+        return png_response(("rat-ob-steps", number),
+                            lambda: synsemts_object.plot_hist_ratob_steps(
+                                title=f'Sequence to sequence steps details for image {number + 1}'))
 
     # graph Levenshtein pairs of characters recurring errors confusion matrix on main report
     @app.route("/ranking_classification_errors/<int:text_id>")
@@ -129,9 +215,7 @@ def generate_html_report(metadata: list,
             Args:
                 text_id (int): id of reference and prediction texts to display ranking associate
         """
-        synsemts_object = VisualSynTS(list_statistics[text_id].source,
-                                      list_statistics[text_id].prediction)
-        plot_confusion_matrix_pairs_errors(text_id)
+        synsemts_object = get_visual_synts(text_id)
         total_pairs_errors = synsemts_object.total_pair_char_errors_max_occurences
         all_ranking = synsemts_object.ranking_pairs_characters_errors_html()
         return render_template("ranking_errors.html",
@@ -146,14 +230,11 @@ def generate_html_report(metadata: list,
         Args:
             number (int): number of reference and prediction texts to display figure associate
         """
-        synsemts_object = VisualSynTS(list_statistics[number].source,
-                                      list_statistics[number].prediction)
-        fig_2 = synsemts_object.plot_pairs_characters_errors_confusion_matrix(
-            title=f'Pairs of characters recurring errors for image {number + 1} (10 char max)')
-        output_2 = io.BytesIO()
-        FigureCanvasAgg(fig_2).print_png(output_2)
-        return Response(output_2.getvalue(),
-                        mimetype="image/png")
+        synsemts_object = get_visual_synts(number)
+        return png_response(("confusion-matrix", number),
+                            lambda: synsemts_object.plot_pairs_characters_errors_confusion_matrix(
+                                title=f'Pairs of characters recurring errors for image '
+                                      f'{number + 1} (10 char max)'))
 
     @app.route("/vs_text/<int:text_id>")
     def show_diff(text_id):
@@ -166,11 +247,12 @@ def generate_html_report(metadata: list,
         reference = element.source
         prediction = element.prediction
         edit_distance_levensthein = element.edit_distance_levensthein
+        if text_id not in diff_html:
+            diff_html[text_id] = show_diff_color_html(reference, prediction)
         return render_template("vs_text.html",
                                reference=reference,
                                prediction=prediction,
-                               color_diff_source_prediction=show_diff_color_html(reference,
-                                                                                 prediction),
+                               color_diff_source_prediction=diff_html[text_id],
                                edit_distance_levensthein=edit_distance_levensthein)
 
     @app.route("/sequences_to_signals/<int:text_id>")
@@ -183,13 +265,16 @@ def generate_html_report(metadata: list,
         """
         reference = list_statistics[text_id].source
         prediction = list_statistics[text_id].prediction
-        object_sts = SequencesToSignals(reference, prediction)
+        object_sts = get_sequences_to_signals(text_id)
         dictionary_char_posweight_html = object_sts.dictionary_latchar_position_weight_html
-        min_interval = int(request.args.get("min_interval", 0))
-        max_interval = int(request.args.get("max_interval", 70))
-        show_deltas = int(request.args.get("show_deltas", int(False)))
-        error_boxes = int(request.args.get("error_boxes", int(True)))
-        plot_sequences_signals_png(text_id, min_interval, max_interval, show_deltas, error_boxes)
+        min_interval = int(request.args.get("min_interval",
+                                            DEFAULT_SIGNALS_PARAMS['min_interval']))
+        max_interval = int(request.args.get("max_interval",
+                                            DEFAULT_SIGNALS_PARAMS['max_interval']))
+        show_deltas = int(request.args.get("show_deltas",
+                                           DEFAULT_SIGNALS_PARAMS['show_deltas']))
+        error_boxes = int(request.args.get("error_boxes",
+                                           DEFAULT_SIGNALS_PARAMS['error_boxes']))
         return render_template("sequences_to_signals.html",
                                min_interval=min_interval,
                                max_interval=max_interval,
@@ -221,33 +306,21 @@ def generate_html_report(metadata: list,
                 show_deltas (bool): display deltas (option)
                 error_boxes (bool): display error boxes (option)
         """
-        object_sts = SequencesToSignals(list_statistics[number].source,
-                                        list_statistics[number].prediction)
-        object_plotsts = PlotSTS(object_sts.sequence_reference,
-                                 object_sts.sequence_prediction,
-                                 object_sts.sequence_reference_encrypt,
-                                 object_sts.sequence_prediction_encrypt,
-                                 object_sts.sequence_reference_steps,
-                                 object_sts.sequence_prediction_steps,
-                                 object_sts.dictionary_latchar_position_weight,
-                                 object_sts.list_deltas)
         show_deltas = bool(show_deltas)
         error_boxes = bool(error_boxes)
-        fig_sequences_signals = \
-            object_plotsts._plot_sentences_signal(sample_b=min_interval,
-                                                  sample_e=max_interval,
-                                                  average_deltas_scatter=show_deltas,
-                                                  error_boxes=error_boxes,
-                                                  title=f"Sequences to signals for "
-                                                        f"image {number + 1} "
-                                                        f"with parameters : "
-                                                        f"interval={min_interval, max_interval} "
-                                                        f"| deltas={show_deltas} | "
-                                                        f"errors boxes={error_boxes}")
-
-        output = io.BytesIO()
-        FigureCanvasAgg(fig_sequences_signals).print_png(output)
-        return Response(output.getvalue(), mimetype="image/png")
+        return png_response(("sequences-signals", number, min_interval, max_interval,
+                             show_deltas, error_boxes),
+                            # only the interval is plotted, from the signals of the text
+                            lambda: plot_signal_window(
+                                get_sequences_to_signals(number).window(min_interval, max_interval),
+                                average_deltas_scatter=show_deltas,
+                                error_boxes=error_boxes,
+                                title=f"Sequences to signals for "
+                                      f"image {number + 1} "
+                                      f"with parameters : "
+                                      f"interval={min_interval, max_interval} "
+                                      f"| deltas={show_deltas} | "
+                                      f"errors boxes={error_boxes}"))
 
     """-- issue : Route for plotting deltas
 
@@ -278,8 +351,157 @@ def generate_html_report(metadata: list,
     def server_error(error):
         return render_template('errors/500.html')
 
+    return app
+
+
+def generate_html_report(metadata: list,
+                         model_name: str,
+                         list_statistics: list,
+                         images: list,
+                         comparison: dict = None,
+                         profile: dict = None) -> None:
+    """ask the name of the user, then serve the Flask application
+    on localhost and open it in the web browser
+
+    Args:
+        metadata (list): differents labels attach to the images if user activate [label]
+        model_name (str): name of model
+        list_statistics (list): list contains SynSemTS objects
+        images (list): list of user's images
+        comparison (dict, optional): see create_app()
+        profile (dict, optional): see create_app()
+    """
+
+    # Alert message and name request :
+    os.popen("say -v Victoria Please, your name is required")
+    username = get_username()
+
+    app = create_app(metadata, model_name, list_statistics, images, username,
+                     comparison=comparison,
+                     profile=profile)
+
     # open the localhost on web browser
     webbrowser.open('http://127.0.0.1:5000/')
 
     # run app on localhost
     app.run()
+
+
+# URLs of the report exported for each image
+IMAGE_URLS = ("/vs_text/{number}",
+              "/ranking_classification_errors/{number}",
+              "/sequences_to_signals/{number}",
+              "/rat-ob-steps-image-{number}.png",
+              "/confusion-matrix-{number}.png",
+              "/sequences-signals-{number}-{signals_params}.png")
+
+
+def get_report_urls(size_images: int) -> list:
+    """list the URLs of the report to export : for each image the versus
+    text, ranking errors and sequences signals pages with their figures
+    (default plot parameters), then the dashboard and the notebook. The
+    URLs of an image are consecutive and start at a multiple of
+    len(IMAGE_URLS) (chunks of the export workers)
+
+    Args:
+        size_images (int): number of images in the report
+
+    Returns:
+        list: URLs of the report
+    """
+    signals_params = "-".join(str(DEFAULT_SIGNALS_PARAMS[param])
+                              for param in ('min_interval',
+                                            'max_interval',
+                                            'show_deltas',
+                                            'error_boxes'))
+    urls = []
+    for number in range(size_images):
+        urls.extend(url.format(number=number, signals_params=signals_params)
+                    for url in IMAGE_URLS)
+    # the pages of the whole report after the images, not to shift their chunks
+    urls.extend(["/", "/KB-notebook"])
+    return urls
+
+
+def _export_url(task: tuple) -> str:
+    """render an URL of the export application and write it in the export
+    directory : the figures keep their name, the pages are written
+    as <url>/index.html to be served by any static web server
+
+    Args:
+        task (tuple): URL and export directory
+
+    Returns:
+        str: path to the file written
+    """
+    url, directory = task
+    response = _EXPORT_APP.test_client().get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"unable to render {url} (status {response.status_code})")
+    if url.endswith(".png"):
+        path = os.path.join(directory, url.lstrip("/"))
+    else:
+        path = os.path.join(directory, url.strip("/"), "index.html")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(response.get_data())
+    return path
+
+
+def export_static_report(directory: str,
+                         metadata: list,
+                         model_name: str,
+                         list_statistics: list,
+                         images: list,
+                         comparison: dict = None,
+                         profile: dict = None,
+                         workers: int = 1) -> list:
+    """headless report : render once all the pages and figures of the
+    report in a static directory, without any prompt, browser or server
+
+    Note
+    ----
+    The pages are rendered with the test client of the Flask application
+    by forked processes (serially on platforms without fork). The sequences
+    signals are exported with their default parameters. The directory must
+    be served at the root of a static web server (absolute URLs).
+
+    Args:
+        directory (str): export directory
+        metadata (list): differents labels attach to the images if user activate [label]
+        model_name (str): name of model
+        list_statistics (list): list contains SynSemTS objects
+        images (list): list of user's images
+        comparison (dict, optional): see create_app()
+        profile (dict, optional): see create_app()
+        workers (int, optional): number of processes. Defaults to 1
+
+    Returns:
+        list: paths to the files written
+    """
+    global _EXPORT_APP
+    try:
+        username = getpass.getuser()
+    except (KeyError, OSError):
+        username = "Kraken-Benchmark"
+    _EXPORT_APP = create_app(metadata, model_name, list_statistics, images, username,
+                             comparison=comparison,
+                             profile=profile)
+    tasks = [(url, directory) for url in get_report_urls(len(list_statistics))]
+    os.makedirs(directory, exist_ok=True)
+
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        # the workers inherit the application (and the metrics objects) by fork,
+        # the URLs of an image go to the same worker to share its analysis
+        # objects : one chunk by image (see get_report_urls())
+        with multiprocessing.get_context("fork").Pool(workers) as pool:
+            paths = pool.map(_export_url, tasks, chunksize=len(IMAGE_URLS))
+    else:
+        paths = [_export_url(task) for task in tasks]
+
+    # static files (logo, user's images...)
+    static_export = os.path.join(directory, "static")
+    if os.path.isdir(static_export):
+        shutil.rmtree(static_export)
+    shutil.copytree(STATIC_DIR, static_export)
+    return paths
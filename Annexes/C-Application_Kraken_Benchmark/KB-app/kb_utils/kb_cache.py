@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK CACHES
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+caches used by the kraken-benchmark.py script to avoid
+paying again the cost of work already done (models loading,
+binarization and segmentation of the pages...)
+"""
+
+# built-in packages
+from collections import OrderedDict
+import hashlib
+import json
+import os
+
+# external packages
+from PIL import Image
+
+
+def get_file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """compute the SHA-256 digest of a file by chunks
+
+        Args:
+            path (str): path to the file
+            chunk_size (int, optional): size of the chunks read. Defaults to 1 Mo
+
+        Returns:
+            str: hexadecimal digest of the file
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ModelCache:
+    """A keyed LRU cache of loaded recognition models
+    (kraken.lib.models.TorchSeqRecognizer objects).
+
+    The key of a model is its absolute path, its modification time and
+    its SHA-256 digest, so a model rewritten on disk is loaded again.
+
+    Attributes:
+        loader (function) : function to load a model from its path
+            (kraken.lib.models.load_any)
+        maxsize (int) : maximum number of models kept in memory
+        hits (int) : number of requests served from the cache
+        misses (int) : number of models loaded
+    """
+
+    def __init__(self, loader, maxsize: int = 4) -> None:
+        """Constructs an empty cache
+
+        Args:
+            loader (function) : function to load a model from its path
+            maxsize (int, optional) : maximum number of models kept in memory.
+                Defaults to 4
+        """
+        self.loader = loader
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        # digests memoized by (path, mtime, size) to avoid reading
+        # the model file again at each request
+        self._digests = {}
+
+    def key(self, path: str) -> tuple:
+        """build the key of a model
+
+        Args:
+            path (str): path to the model
+
+        Returns:
+            tuple: absolute path, modification time and SHA-256 digest
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if signature not in self._digests:
+            self._digests[signature] = get_file_sha256(path)
+        return path, stat.st_mtime_ns, self._digests[signature]
+
+    def get(self, path: str) -> object:
+        """returns the loaded model, load it if it is not in the cache
+        and drop the least recently used model if the cache is full
+
+        Args:
+            path (str): path to the model
+
+        Returns:
+            object: loaded model
+        """
+        key = self.key(path)
+        if key in self._models:
+            self.hits += 1
+            self._models.move_to_end(key)
+            return self._models[key]
+
+        self.misses += 1
+        model_load = self.loader(path)
+        self._models[key] = model_load
+        if len(self._models) > self.maxsize:
+            self._models.popitem(last=False)
+        return model_load
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+class PageCache:
+    """A content-addressed on-disk cache of the binarized and segmented pages.
+
+    The binarization and the segmentation do not depend on the recognition
+    model : the key of a page is the SHA-256 digest of the image and of the
+    binarization and segmentation parameters. For each key the cache stores :
+
+    * {key}.png : binarized bitmap (compressed PNG)
+    * {key}.json : segmentation boxes
+
+    Attributes:
+        cache_dir (str) : directory of the cache
+        parameters (str) : binarization and segmentation parameters serialized
+        hits (int) : number of pages served from the cache
+        misses (int) : number of pages not found in the cache
+    """
+
+    def __init__(self, cache_dir: str, binarization_params: dict, segmentation_params: dict) -> None:
+        """Constructs the cache and creates its directory
+
+        Args:
+            cache_dir (str) : directory of the cache
+            binarization_params (dict) : parameters of binarization.nlbin()
+            segmentation_params (dict) : parameters of pageseg.segment()
+        """
+        self.cache_dir = cache_dir
+        self.parameters = json.dumps({'binarization': binarization_params,
+                                      'segmentation': segmentation_params},
+                                     sort_keys=True)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, image: str) -> str:
+        """build the key of a page
+
+        Args:
+            image (str): path to the user's image
+
+        Returns:
+            str: hexadecimal digest of the image and the parameters
+        """
+        sha256 = hashlib.sha256(get_file_sha256(image).encode())
+        sha256.update(self.parameters.encode())
+        return sha256.hexdigest()
+
+    def get(self, image: str):
+        """retrieve the binarized image and the segments of a page
+
+        Args:
+            image (str): path to the user's image
+
+        Returns:
+            tuple: binarized image (PIL object) and segments (dict),
+                None if the page is not in the cache
+        """
+        path = os.path.join(self.cache_dir, self.key(image))
+        try:
+            with open(f"{path}.json", "r") as file:
+                segments_image = json.load(file)
+            with Image.open(f"{path}.png") as im_bin:
+                im_bin.load()
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return im_bin, segments_image
+
+    def put(self, image: str, im_bin: object, segments_image: dict) -> None:
+        """store the binarized image and the segments of a page
+
+        Args:
+            image (str): path to the user's image
+            im_bin (object): binarized image (PIL object)
+            segments_image (dict): segments of the binarized image
+        """
+        path = os.path.join(self.cache_dir, self.key(image))
+        im_bin.save(f"{path}.png", optimize=True)
+        # the segments are written last : a page is in the cache
+        # only when both files are complete
+        with open(f"{path}.json.tmp", "w") as file:
+            # numpy integers of the boxes are serialized as int
+            json.dump(segments_image, file, default=int)
+        os.replace(f"{path}.json.tmp", f"{path}.json")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK RUN JOURNAL
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+per-page results journal of a benchmark run, a restarted run
+skips the pages already transcribed and retries the pages quarantined
+"""
+
+# built-in packages
+import json
+import os
+
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class RunJournal:
+    """An append-only journal (JSON Lines) of the page records of a run,
+    stored in the run directory.
+
+    A line is written (and flushed to the disk) as soon as a page leaves
+    the OCR pipeline, with its transcriptions, timing and error. When the
+    journal is reopened, the last record of each image wins.
+
+    Attributes:
+        run_dir (str) : directory of the run
+        path (str) : path to the journal file
+        records (dict) : image (key) and its last page record (value)
+    """
+
+    def __init__(self, run_dir: str) -> None:
+        """Constructs the journal, creates the run directory
+        and loads the records of a previous run if any
+
+        Args:
+            run_dir (str) : directory of the run
+        """
+        self.run_dir = run_dir
+        self.path = os.path.join(run_dir, JOURNAL_NAME)
+        self.records = {}
+        os.makedirs(run_dir, exist_ok=True)
+        if os.path.isfile(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # last line truncated by an interrupted run
+                        continue
+                    self.records[record['image']] = record
+
+    def completed(self, image: str, model_list: list) -> dict:
+        """returns the record of a page already transcribed by all the models
+
+        Args:
+            image (str): path to the user's image
+            model_list (list): relative paths to the ML models
+
+        Returns:
+            dict: page record, None if the page has to be (re)transcribed
+        """
+        record = self.records.get(image)
+        if record is None or record['error'] is not None:
+            return None
+        if not all(model in record['transcriptions'] for model in model_list):
+            return None
+        return record
+
+    def write(self, record: dict) -> None:
+        """append a page record to the journal
+
+        Args:
+            record (dict): page record, see transcribe_page()
+        """
+        record = {key: value for key, value in record.items() if key != 'cache'}
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self.records[record['image']] = record
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""KRAKEN-BENCHMARK RUN PROFILE
+
+Author : Lucas Terriel
+Date : 22/07/2020
+
+per-stage timings of a benchmark run (OCR pipeline and metrics),
+throughput and peak memory, exported in JSON and CSV
+"""
+
+# built-in packages
+import csv
+import json
+import os
+import resource
+import sys
+
+
+def percentile(values: list, rank: float) -> float:
+    """compute a percentile with a linear interpolation
+    between the closest ranks (same as numpy.percentile())
+
+    Examples
+    --------
+        >>> percentile([1, 2, 3, 4], 50)
+        2.5
+
+    Args:
+        values (list): list of values
+        rank (float): percentile to compute, between 0 and 100
+
+    Returns:
+        float: percentile of the values, 0.0 if there is no value
+    """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    position = (len(values) - 1) * rank / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def get_peak_rss() -> dict:
+    """retrieve the peak resident set size of the program
+    and of its terminated children (process pool workers)
+
+    Returns:
+        dict: peak RSS in Mo of the program ('self') and of its children ('children')
+    """
+    # ru_maxrss is given in kilobytes on Linux and in bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return {who: round(resource.getrusage(flag).ru_maxrss * unit / (1024 ** 2), 2)
+            for who, flag in (('self', resource.RUSAGE_SELF),
+                              ('children', resource.RUSAGE_CHILDREN))}
+
+
+class RunProfile:
+    """Timings of the stages of a run, page by page.
+
+    Attributes:
+        timings (list) : image, stage and duration in seconds of each page stage
+        phases (dict) : name of the phase ('OCR', 'Metrics'...) (key)
+            and its wall time in seconds and number of pages (value)
+    """
+
+    def __init__(self) -> None:
+        """Constructs an empty profile
+        """
+        self.timings = []
+        self.phases = {}
+
+    def add(self, image: str, stage: str, seconds: float) -> None:
+        """record the duration of a stage for a page
+
+        Args:
+            image (str): path to the user's image
+            stage (str): label of the stage
+            seconds (float): duration of the stage
+        """
+        self.timings.append((image, stage, seconds))
+
+    def add_page(self, record: dict) -> None:
+        """record the durations of the stages of a page record
+
+        Args:
+            record (dict): page record, see transcribe_page()
+        """
+        for stage, seconds in record['timings'].items():
+            self.add(record['image'], stage, seconds)
+
+    def add_phase(self, phase: str, seconds: float, pages: int) -> None:
+        """record the wall time of a phase of the run
+
+        Args:
+            phase (str): label of the phase
+            seconds (float): wall time of the phase
+            pages (int): number of pages processed during the phase
+        """
+        wall_time, number_pages = self.phases.get(phase, (0.0, 0))
+        self.phases[phase] = (wall_time + seconds, number_pages + pages)
+
+    def summary(self) -> dict:
+        """statistics of each stage, in order of appearance
+
+        Returns:
+            dict: label of the stage (key) and its number of pages, total,
+                mean, p50, p95 and p99 durations in seconds (value)
+        """
+        durations = {}
+        for _, stage, seconds in self.timings:
+            durations.setdefault(stage, []).append(seconds)
+        return {stage: {'pages': len(values),
+                        'total': sum(values),
+                        'mean': sum(values) / len(values),
+                        'p50': percentile(values, 50),
+                        'p95': percentile(values, 95),
+                        'p99': percentile(values, 99)}
+                for stage, values in durations.items()}
+
+    def throughput(self) -> dict:
+        """pages per second of each phase
+
+        Returns:
+            dict: label of the phase (key) and its wall time, number of pages
+                and pages per second (value)
+        """
+        return {phase: {'wall_time': wall_time,
+                        'pages': pages,
+                        'pages_per_second': pages / wall_time if wall_time else 0.0}
+                for phase, (wall_time, pages) in self.phases.items()}
+
+    def to_dict(self) -> dict:
+        """gather the profile of the run
+
+        Returns:
+            dict: stages statistics, throughput of the phases and peak RSS
+        """
+        return {'stages': self.summary(),
+                'phases': self.throughput(),
+                'peak_rss': get_peak_rss()}
+
+    def export(self, directory: str) -> tuple:
+        """write the profile of the run :
+
+        * profile.json : stages statistics, throughput and peak RSS
+        * profile.csv : duration of each stage for each page
+
+        Args:
+            directory (str): directory of the profile files
+
+        Returns:
+            tuple: paths to the JSON and CSV files
+        """
+        os.makedirs(directory, exist_ok=True)
+        path_json = os.path.join(directory, "profile.json")
+        path_csv = os.path.join(directory, "profile.csv")
+        with open(path_json, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+        with open(path_csv, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["image", "stage", "seconds"])
+            writer.writerows(self.timings)
+        return path_json, path_csv
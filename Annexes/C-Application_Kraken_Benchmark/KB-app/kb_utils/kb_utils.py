@@ -43,6 +43,20 @@ def load_input(path: str):
     transcription_gt_files = sorted(glob.glob(transcription_gt_path, recursive=True))
     return model_name, model_file, image_files, transcription_gt_files
 
+def load_models(path: str) -> list:
+    """recover all the user's models in a sorted list,
+    use it to compare several models in one run
+
+        Args:
+            path (str): relatif path to access on user's files
+
+        Returns:
+            list : list contains paths to the models
+    """
+    model_path = os.path.join(path, os.path.join('*', "*.mlmodel"))
+    return sorted(glob.glob(model_path, recursive=True))
+
+
 def report_log(message, type_log="I") -> None:
     """Print a log report
 
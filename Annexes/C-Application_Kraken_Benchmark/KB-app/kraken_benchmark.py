@@ -22,6 +22,9 @@ dashboard in the form of a Flask application.
 ===========
 
 kraken_benchmark.py [-h] [--input INPUT] [--label] [--verbosity] [--clean_text]
+                    [--workers WORKERS] [--session] [--page_cache PAGE_CACHE]
+                    [--compare] [--batch_size BATCH_SIZE] [--run_dir RUN_DIR]
+                    [--profile PROFILE] [--export EXPORT]
 
 -| Options |-
 =============
@@ -38,205 +41,998 @@ image to display it in the HTML dashboard
 non-alphabetic characters, punctuation, numbers.
 depends on the needs of the project.
 
+5. [:workers:] Number of processes to transcribe the pages in parallel,
+each worker loads the model once, then to compute the metrics of the
+pages in parallel (default = 1)
+
+6. [:session:] Keep the models loaded in a cache and benchmark the test set
+directories read on the standard input (one per line), each model
+is loaded only once for all the test sets
+
+7. [:page_cache:] Directory of an on-disk cache of the binarized and segmented
+pages (keyed by image and parameters), a new model benchmarked on the
+same images skips straight to the text recognition
+
+8. [:compare:] Compare all the models found in the input directory in one run,
+the binarization and segmentation are shared by the models and the
+HTML dashboard shows a side-by-side CER/WER table
+
+9. [:batch_size:] Recognize the lines in batches of BATCH_SIZE lines collected
+across pages instead of line by line, the predictions are reassembled
+per page in reading order (with a kraken release which predicts in batches,
+otherwise the lines are recognized one by one)
+
+10. [:run_dir:] Directory of the run : each page record (transcriptions, time, error)
+is written in a journal (journal.jsonl), a restarted run skips the pages already
+transcribed. A page that fails is quarantined and reported instead of aborting
+the benchmark
+
+11. [:profile:] Directory where the profile of the run is exported : timings of
+each stage by page (profile.csv), throughput, p50/p95/p99 latencies by stage and
+peak memory (profile.json). The stages breakdown is also shown in the HTML report
+
+12. [:export:] Headless mode : the report pages and figures are rendered once (in
+parallel with workers) in the static directory EXPORT, without username prompt,
+web browser or server. Serve it at the root of any static web server
+
 -| Basic I/O |-
 
-Input => Images / Ground Truth Transcription (.txt files) / model (.mlmodel).
+Input => Images / Ground Truth Transcription (.txt files) / model(s) (.mlmodel).
 output => kraken benchmark metrics report (.html) with Flask.
 
-# TODO(Lucas) : slice get_transcription more finely to optimize
 # TODO(Lucas) : make binarization optional
 """
 
 # built-in packages
 import argparse
-from copy import deepcopy
+import inspect
+import itertools
+import multiprocessing
+import os
 import sys
 import time
 import unicodedata
 
 # external packages
+from bidi.algorithm import get_display
 from kraken import rpred, pageseg, binarization
 from kraken.lib import models
+from kraken.lib.dataset import generate_input_transforms
+from kraken.lib.segmentation import extract_polygons
 from PIL import Image
 import pyfiglet
+import torch
 from tqdm import tqdm
 
 # local packages
-from kb_utils.kb_utils import load_input, get_list_tuple, \
+from kb_utils.kb_cache import ModelCache, PageCache
+from kb_utils.kb_journal import RunJournal
+from kb_utils.kb_profile import RunProfile
+from kb_utils.kb_utils import load_input, load_models, get_list_tuple, \
     build_open_files_set, get_metadata, report_log
-from STS_Tools.SynSemTS import TranscriptionMetricsTools
-from kb_report.routing import generate_html_report
-
-
-def try_control_step(list_1: list, list_2: list, label_step: str) -> str:
-    """perform a test to compare if two lists have the same length
+from STS_Tools.SynSemTS import TranscriptionMetricsRecord, TranscriptionMetricsTools, truncate
+from kb_report.routing import generate_html_report, export_static_report
+
+
+# steps of the OCR pipeline applied to each page, in order
+OCR_STEPS = ("Images loaded",
+             "Binarization",
+             "Segmentation",
+             "Text recognition",
+             "Transcription")
+
+# error message associate to each step of the OCR pipeline
+OCR_STEPS_ERRORS = ("unable to load images",
+                    "unable to binarize",
+                    "unable to segment",
+                    "unable to recognize text",
+                    "unable to transcribe")
+
+# parameters of binarization.nlbin() (kraken defaults) and pageseg.segment(),
+# they are part of the key of the pages in the page cache
+BINARIZATION_PARAMS = {'threshold': 0.5,
+                       'zoom': 0.5,
+                       'escale': 1.0,
+                       'border': 0.1,
+                       'perc': 80,
+                       'range': 20,
+                       'low': 5,
+                       'high': 90}
+SEGMENTATION_PARAMS = {'text_direction': 'horizontal-lr'}
+
+# models loaded once, page cache and batch size of each worker of the process pool (see _init_worker())
+_WORKER_MODELS = None
+_WORKER_PAGE_CACHE = None
+_WORKER_BATCH_SIZE = None
+
+
+def try_control_step(counter_1: int, counter_2: int, label_step: str) -> str:
+    """perform a test to compare if two running counters have the same value
 
     Examples
     --------
 
-        >>> list_1 = ['a', 'b']
-        >>> list_2 = [1, 2, 3]
+        >>> counter_1 = 2
+        >>> counter_2 = 3
         >>> label = 'binarization'
-        >>> try_control_step(list_1, list_2, label)
+        >>> try_control_step(counter_1, counter_2, label)
         *** Error binarization ***
-        TypeError: The number of elements in lists are not the same
+        TypeError: The number of elements processed are not the same
 
     Args:
-        list_1 (list): list to compare
-        list_2 (list): another list to compare
+        counter_1 (int): number of elements processed to compare
+        counter_2 (int): another number of elements processed to compare
         label_step (str): label of the current process
 
     Returns:
         str: success message
 
     Raises:
-        TypeError: if len(list_1) != len(list_2)
+        TypeError: if counter_1 != counter_2
 
     """
-    if len(list_1) != len(list_2):
+    if counter_1 != counter_2:
         report_log(f"*** Error {label_step} ***", "E")
-        raise TypeError('The number of elements in lists are not the same')
+        raise TypeError('The number of elements processed are not the same')
     return report_log(f"\n{'#' * 10} {label_step} done \u2713 {'#' * 10}\n", "S")
 
 
-def get_transcription(images: list, model: str, opt_verbose: bool) -> list:
-    """built from images and an offline recognition model of the text
-    of the separate transcripts for each image.
+def _new_page_record(image: str) -> dict:
+    """create the record of a page, see transcribe_page()
+
+    Args:
+        image (str): path to the user's image
+
+    Returns:
+        dict: empty page record
+    """
+    return {'image': image,
+            'transcriptions': None,
+            'steps': 0,
+            'cache': None,
+            'time': 0.0,
+            'timings': {},
+            'error': None,
+            'exception': None}
+
+
+def _set_page_error(record: dict, exception: Exception) -> None:
+    """fill the error message of a page record according
+    to the step where the pipeline failed
+
+    Args:
+        record (dict): page record
+        exception (Exception): exception raised by the step
+    """
+    record['error'] = f"{OCR_STEPS_ERRORS[record['steps']]} - {record['image']}"
+    record['exception'] = str(exception)
+
+
+def _time_stage(record: dict, stage: str, start: float) -> float:
+    """add the time elapsed since start to a stage of a page record
+
+    Args:
+        record (dict): page record
+        stage (str): label of the stage
+        start (float): time.perf_counter() value at the start of the stage
+
+    Returns:
+        float: time.perf_counter() value at the end of the stage
+    """
+    end = time.perf_counter()
+    record['timings'][stage] = record['timings'].get(stage, 0.0) + end - start
+    return end
+
+
+def preprocess_page(image: str, record: dict, page_cache: object = None) -> tuple:
+    """open, binarize and segment a page (steps 1 to 3 of the OCR pipeline),
+    the steps are skipped when the page is found in the page cache
+
+    Args:
+        image (str): path to the user's image
+        record (dict): page record, its steps and cache status are updated
+        page_cache (object, optional): PageCache of the binarized and segmented pages
+
+    Returns:
+        tuple: binarized image (PIL object) and segments of the image (dict)
+    """
+    start = time.perf_counter()
+    cached_page = None
+    if page_cache is not None:
+        cached_page = page_cache.get(image)
+        record['cache'] = 'miss' if cached_page is None else 'hit'
+        start = _time_stage(record, 'Page cache', start)
+
+    if cached_page is not None:
+        record['steps'] += 3
+        return cached_page
+
+    # opening image as PIL object
+    with Image.open(image) as img_pil:
+        img_pil.load()
+        record['steps'] += 1
+        start = _time_stage(record, OCR_STEPS[0], start)
+        # creates binarized image
+        im_bin = binarization.nlbin(img_pil, **BINARIZATION_PARAMS)
+    record['steps'] += 1
+    start = _time_stage(record, OCR_STEPS[1], start)
+    # retrieves the coordinates of the segments from the binarized image
+    segments_image = pageseg.segment(im_bin, **SEGMENTATION_PARAMS)
+    record['steps'] += 1
+    start = _time_stage(record, OCR_STEPS[2], start)
+    if page_cache is not None:
+        page_cache.put(image, im_bin, segments_image)
+        _time_stage(record, 'Page cache', start)
+    return im_bin, segments_image
+
+
+def get_line_images(im_bin: object, segments_image: dict) -> list:
+    """crop the lines of a segmented page in reading order
+
+    Args:
+        im_bin (object): binarized image (PIL object)
+        segments_image (dict): segments of the binarized image
+
+    Returns:
+        list: lines images (PIL objects), None for an empty line
+    """
+    return [line_im if line_im.size[0] and line_im.size[1] else None
+            for line_im, _ in extract_polygons(im_bin, segments_image)]
+
+
+def supports_batched_prediction(models_load: dict) -> bool:
+    """check that all the models have the batched predict_string(line, lens)
+    of the recent kraken releases, the older ones only recognize a line
+    at a time (the pipeline then falls back on kraken.rpred.rpred())
+
+    Args:
+        models_load (dict): relative path to the ML model (key) and
+            kraken.lib.models.TorchSeqRecognizer object (value)
+
+    Returns:
+        bool: True if the lines can be recognized in batches
+    """
+    for model_load in models_load.values():
+        try:
+            parameters = inspect.signature(model_load.predict_string).parameters
+        except (AttributeError, TypeError, ValueError):
+            return False
+        if 'lens' not in parameters:
+            return False
+    return True
+
+
+def _predict_batches(model_load: object, lines: list, batch_size: int) -> list:
+    """run the lines through the recognizer in fixed-size batches
+
+    Note
+    ----
+    Only the lines with the same number of channels and height can share a batch.
+    They are sorted by width to reduce the padding.
+
+    Args:
+        model_load (object): kraken.lib.models.TorchSeqRecognizer object
+        lines (list): lines tensors (channels, height, width), None for an empty line
+        batch_size (int): maximum number of lines in a batch
+
+    Returns:
+        list: text prediction of each line, in input order
+    """
+    predictions = [''] * len(lines)
+    indexes = sorted((index for index, line in enumerate(lines) if line is not None),
+                     key=lambda index: tuple(lines[index].shape))
+    for _, group in itertools.groupby(indexes, key=lambda index: tuple(lines[index].shape[:-1])):
+        group = list(group)
+        for start in range(0, len(group), batch_size):
+            chunk = group[start:start + batch_size]
+            lens = torch.tensor([lines[index].shape[-1] for index in chunk])
+            batch = torch.zeros(len(chunk), *lines[chunk[0]].shape[:-1], int(lens.max()))
+            for row, index in enumerate(chunk):
+                batch[row, ..., :lens[row]] = lines[index]
+            for index, text in zip(chunk, model_load.predict_string(batch, lens)):
+                predictions[index] = get_display(text)
+    return predictions
+
+
+def recognize_lines_batched(models_load: dict, line_images: list, batch_size: int) -> dict:
+    """batched text recognition of lines coming from one or several pages
+
+    Args:
+        models_load (dict): relative path to the ML model (key) and
+            kraken.lib.models.TorchSeqRecognizer object (value)
+        line_images (list): lines images (PIL objects), None for an empty line
+        batch_size (int): maximum number of lines in a batch
+
+    Returns:
+        dict: relative path to the ML model (key) and text prediction
+            of each line in input order (value)
+    """
+    predictions = {}
+    for model, model_load in models_load.items():
+        batch, channels, height, width = model_load.nn.input
+        # same input transformations as kraken.rpred.rpred() (pad=16)
+        transforms = generate_input_transforms(batch, height, width, channels, 16)
+        lines = [None if line_im is None else transforms(line_im) for line_im in line_images]
+        predictions[model] = _predict_batches(model_load, lines, batch_size)
+    return predictions
+
+
+def _recognize_window(window: list, models_load: dict, batch_size: int):
+    """recognize together the lines of a window of pages, then reassemble
+    the predictions per page in reading order
+
+    Args:
+        window (list): page records and their lines images
+        models_load (dict): relative path to the ML model (key) and
+            kraken.lib.models.TorchSeqRecognizer object (value)
+        batch_size (int): maximum number of lines in a batch
+
+    Yields:
+        dict: page record, in input order
+    """
+    pages = [(record, line_images) for record, line_images in window if record['error'] is None]
+    number_lines = sum(len(line_images) for _, line_images in pages)
+    start = time.perf_counter()
+    try:
+        predictions = recognize_lines_batched(models_load,
+                                              [line_im
+                                               for _, line_images in pages
+                                               for line_im in line_images],
+                                              batch_size)
+        elapsed = time.perf_counter() - start
+        offset = 0
+        for record, line_images in pages:
+            # the time of the window is shared by the pages according to their lines
+            share = elapsed * len(line_images) / number_lines if number_lines else 0.0
+            record['timings'][OCR_STEPS[3]] = record['timings'].get(OCR_STEPS[3], 0.0) + share
+            record['steps'] += 1
+            start = time.perf_counter()
+            end = offset + len(line_images)
+            record['transcriptions'] = {model: "".join(unicodedata.normalize('NFC', line)
+                                                       for line in lines[offset:end])
+                                        for model, lines in predictions.items()}
+            record['steps'] += 1
+            _time_stage(record, OCR_STEPS[4], start)
+            record['time'] += share + record['timings'][OCR_STEPS[4]]
+            offset = end
+    except Exception as exception:
+        for record, _ in pages:
+            _set_page_error(record, exception)
+    for record, _ in window:
+        yield record
+
+
+def iter_page_records_batched(images: list,
+                              models_load: dict,
+                              batch_size: int,
+                              page_cache: object = None):
+    """OCR pipeline with the text recognition batched across pages : the lines
+    of the successive pages are collected until they fill a batch, then
+    recognized together and reassembled per page.
+
+    Args:
+        images (list): list of user's images
+        models_load (dict): relative path to the ML model (key) and
+            kraken.lib.models.TorchSeqRecognizer object (value)
+        batch_size (int): maximum number of lines in a batch
+        page_cache (object, optional): PageCache of the binarized and segmented pages
+
+    Yields:
+        dict: page record, see transcribe_page()
+    """
+    window = []
+    number_lines = 0
+    for img in images:
+        record = _new_page_record(img)
+        line_images = []
+        start = time.perf_counter()
+        try:
+            im_bin, segments_image = preprocess_page(img, record, page_cache)
+            # the lines cropping is part of the text recognition stage
+            start_lines = time.perf_counter()
+            line_images = get_line_images(im_bin, segments_image)
+            _time_stage(record, OCR_STEPS[3], start_lines)
+        except Exception as exception:
+            _set_page_error(record, exception)
+        record['time'] += time.perf_counter() - start
+        window.append((record, line_images))
+        number_lines += len(line_images)
+        if number_lines >= batch_size:
+            yield from _recognize_window(window, models_load, batch_size)
+            window = []
+            number_lines = 0
+    yield from _recognize_window(window, models_load, batch_size)
+
+
+def transcribe_page(image: str,
+                    models_load: dict,
+                    page_cache: object = None,
+                    batch_size: int = None) -> dict:
+    """run the complete OCR pipeline on a single page, the intermediate
+    objects (PIL image, binarized image, segments) are released as soon
+    as the page is transcribed.
+
     Process
     -------
-    * 1- Open images
+    * 1- Open image
     * 2- Binarization
     * 3- Segmentation
-    * 4- Text recognition
+    * 4- Text recognition (with each model)
     * 5- Convert transcription kraken object in string format
 
+    Note
+    ----
+    The binarization and the segmentation are shared by all the models.
+    If a page cache is used, the steps 1 to 3 are skipped when the
+    binarized and segmented page is found in the cache.
+
+    Args:
+        image (str): path to the user's image
+        models_load (dict): relative path to the ML model (key) and
+            kraken.lib.models.TorchSeqRecognizer object (value)
+        page_cache (object, optional): PageCache of the binarized and segmented pages
+        batch_size (int, optional): recognize the lines of the page in batches
+            of batch_size lines instead of one by one with kraken.rpred.rpred(),
+            ignored if the kraken release has no batched prediction
+            (see supports_batched_prediction())
+
+    Returns:
+        dict: page record with the image, the transcriptions by model (None if failed),
+            the number of steps done, the page cache status ('hit', 'miss' or None),
+            the processing time in seconds (total and by stage) and the error message if any
+    """
+    record = _new_page_record(image)
+    start = time.perf_counter()
+    try:
+        im_bin, segments_image = preprocess_page(image, record, page_cache)
+        start_stage = time.perf_counter()
+
+        if batch_size and supports_batched_prediction(models_load):
+            predictions = recognize_lines_batched(models_load,
+                                                  get_line_images(im_bin, segments_image),
+                                                  batch_size)
+            record['steps'] += 1
+            start_stage = _time_stage(record, OCR_STEPS[3], start_stage)
+            record['transcriptions'] = {model: "".join(unicodedata.normalize('NFC', line)
+                                                       for line in lines)
+                                        for model, lines in predictions.items()}
+            record['steps'] += 1
+            _time_stage(record, OCR_STEPS[4], start_stage)
+            return record
+
+        # created the text predictions (kraken.rpred.mm_rpred object is a lazy
+        # generator, the lines are recognized here to time the stage)
+        predictions = {model: list(rpred.rpred(model_load,
+                                               im_bin,
+                                               segments_image,
+                                               bidi_reordering=True))
+                       for model, model_load in models_load.items()}
+        record['steps'] += 1
+        start_stage = _time_stage(record, OCR_STEPS[3], start_stage)
+        # .prediction is a kraken_ocr_record class attribute for recover the text in
+        # kraken.rpred.mm_rpred object
+        record['transcriptions'] = {model: "".join(unicodedata.normalize('NFC', line.prediction)
+                                                   for line in prediction)
+                                    for model, prediction in predictions.items()}
+        record['steps'] += 1
+        _time_stage(record, OCR_STEPS[4], start_stage)
+    except Exception as exception:
+        _set_page_error(record, exception)
+    finally:
+        record['time'] = time.perf_counter() - start
+    return record
+
+
+def _init_worker(model_list: list = None,
+                 page_cache_dir: str = None,
+                 batch_size: int = None) -> None:
+    """initializer of the process pool : each worker keeps its own
+    cache of loaded models for all the pages it receives
+
+    Args:
+        model_list (list, optional): relative paths to the ML models to preload
+        page_cache_dir (str, optional): directory of the page cache
+        batch_size (int, optional): batch size of the lines of a page
+    """
+    global _WORKER_MODELS, _WORKER_PAGE_CACHE, _WORKER_BATCH_SIZE
+    model_list = model_list or []
+    # one intra-op thread per worker, the parallelism comes from the pool
+    torch.set_num_threads(1)
+    # all the compared models must stay in the cache
+    _WORKER_MODELS = ModelCache(models.load_any, maxsize=max(4, len(model_list)))
+    if page_cache_dir is not None:
+        _WORKER_PAGE_CACHE = PageCache(page_cache_dir, BINARIZATION_PARAMS, SEGMENTATION_PARAMS)
+    _WORKER_BATCH_SIZE = batch_size
+    models_load = {model: _WORKER_MODELS.get(model) for model in model_list}
+    if batch_size and models_load and not supports_batched_prediction(models_load):
+        report_log("Warning : no batched prediction in this kraken release, "
+                   "the lines are recognized one by one", "W")
+
+
+def _transcribe_page_worker(task: tuple) -> dict:
+    """run transcribe_page() in a worker of the process pool
+    with the models cached by _init_worker()
+
+    Args:
+        task (tuple): path to the user's image and relative paths to the ML models
+
+    Returns:
+        dict: page record, see transcribe_page()
+    """
+    image, model_list = task
+    models_load = {model: _WORKER_MODELS.get(model) for model in model_list}
+    return transcribe_page(image, models_load, _WORKER_PAGE_CACHE, _WORKER_BATCH_SIZE)
+
+
+def iter_page_records(images: list,
+                      model_list: list,
+                      workers: int = 1,
+                      pool: object = None,
+                      model_cache: object = None,
+                      page_cache_dir: str = None,
+                      batch_size: int = None):
+    """transcribe the pages serially or fan them out to a process pool,
+    the page records always come back in input order.
+
+    Note
+    ----
+    With batch_size, the serial pipeline batches the lines across pages
+    (see iter_page_records_batched()) and the workers of a pool batch
+    the lines of each page.
+
+    Args:
+        images (list): list of user's images
+        model_list (list): relative paths to the ML models
+        workers (int): number of processes. Defaults to 1 (no pool)
+        pool (object, optional): running multiprocessing.Pool to reuse (session mode)
+        model_cache (object, optional): ModelCache to reuse in serial mode (session mode)
+        page_cache_dir (str, optional): directory of the page cache, ignored
+            with a running pool (it is given to its initializer)
+        batch_size (int, optional): batch size of the text recognition, ignored
+            with a running pool (it is given to its initializer)
+
+    Yields:
+        dict: page record, see transcribe_page()
+    """
+    tasks = [(img, tuple(model_list)) for img in images]
+    if pool is not None:
+        # imap keeps the input order of the images
+        yield from pool.imap(_transcribe_page_worker, tasks)
+    elif workers > 1:
+        with multiprocessing.Pool(workers,
+                                  initializer=_init_worker,
+                                  initargs=(model_list, page_cache_dir, batch_size)) as pool_run:
+            report_log(f"\n{'#' * 10} Model loaded in {workers} workers \u2713 {'#' * 10}\n", "S")
+            yield from pool_run.imap(_transcribe_page_worker, tasks)
+    else:
+        # Loading the models like kraken.lib.models.TorchSeqRecognizer objects
+        # --- Issue : find a way to ignore the output precautionary message
+        if model_cache is not None:
+            models_load = {model: model_cache.get(model) for model in model_list}
+        else:
+            models_load = {model: models.load_any(model) for model in model_list}
+        # At each new step, a validation message is displayed :
+        report_log(f"\n{'#' * 10} Model loaded \u2713 {'#' * 10}\n", "S")
+        page_cache = None
+        if page_cache_dir is not None:
+            page_cache = PageCache(page_cache_dir, BINARIZATION_PARAMS, SEGMENTATION_PARAMS)
+        if batch_size and not supports_batched_prediction(models_load):
+            report_log("Warning : no batched prediction in this kraken release, "
+                       "the lines are recognized one by one", "W")
+            batch_size = None
+        if batch_size:
+            yield from iter_page_records_batched(images, models_load, batch_size, page_cache)
+        else:
+            for img in images:
+                yield transcribe_page(img, models_load, page_cache)
+
+
+def stream_transcription(images: list,
+                         model_list: list,
+                         opt_verbose: bool,
+                         workers: int = 1,
+                         journal: object = None,
+                         profile: object = None,
+                         **kwargs):
+    """generator-based OCR pipeline : each page goes through all the steps
+    (open, binarization, segmentation, text recognition, transcription)
+    and is released before the next one starts.
+
+    Note
+    ----
+    A page that fails is quarantined : the error is reported, None is
+    yielded in place of its transcriptions and the benchmark goes on.
+    With a run journal, each page record is written in the journal and
+    the pages already transcribed by a previous run are not processed again.
+
+    Args:
+        images (list): list of user's images
+        model_list (list): relative paths to the ML models
+        opt_verbose (bool): if user activate verbose option
+        workers (int): number of processes. Defaults to 1 (no pool)
+        journal (object, optional): RunJournal of the run
+        profile (object, optional): RunProfile of the run, the stages of
+            each page and the wall time of the OCR phase are recorded
+        **kwargs : pool, model_cache, page_cache_dir or batch_size, see iter_page_records()
+
+    Yields:
+        dict: the text prediction of each image by model (None if the page
+            is quarantined), in input order
+    """
+    completed = {}
+    if journal is not None:
+        completed = {img: journal.completed(img, model_list) for img in images}
+        completed = {img: record for img, record in completed.items() if record is not None}
+        if completed:
+            report_log(f"* Resume run : {len(completed)} pages already transcribed *")
+    pending = [img for img in images if img not in completed]
+
+    # running counters of the pages that passed each step
+    counters = dict.fromkeys(OCR_STEPS, 0)
+    # running counters of the page cache
+    cache_counters = {'hit': 0, 'miss': 0}
+    quarantined = []
+    start = time.perf_counter()
+    pbar = tqdm(iter_page_records(pending, model_list, workers, **kwargs) if pending else [],
+                total=len(pending),
+                desc='OCR in progress :')
+    records = iter(pbar)
+    for img in images:
+        if img in completed:
+            yield {model: completed[img]['transcriptions'][model] for model in model_list}
+            continue
+
+        record = next(records)
+        pbar.set_description(f'Processing {record["image"]} element :')
+        if record['cache'] is not None:
+            cache_counters[record['cache']] += 1
+        if journal is not None:
+            journal.write(record)
+        if profile is not None:
+            profile.add_page(record)
+
+        if record['error'] is not None:
+            report_log(f"type : {record['exception']}")
+            report_log(f"Error : {record['error']} (page quarantined)", "W")
+            quarantined.append(record['image'])
+            yield None
+            continue
+
+        for step in OCR_STEPS[:record['steps']]:
+            counters[step] += 1
+
+        if opt_verbose:
+            report_log(record, "V")
+
+        yield record['transcriptions']
+    # let the pipeline release its resources (process pool)
+    next(records, None)
+    pbar.close()
+    if profile is not None:
+        profile.add_phase('OCR', time.perf_counter() - start, len(pending))
+
+    # CONTROL STEPS
+    # test if each step has processed the same number of pages as pages transcribed
+    for step in OCR_STEPS:
+        try_control_step(counters[step], len(pending) - len(quarantined), step)
+
+    if sum(cache_counters.values()):
+        report_log(f"page cache : {cache_counters['hit']} hits | "
+                   f"{cache_counters['miss']} misses")
+    if quarantined:
+        report_log(f"{len(quarantined)} pages quarantined : {', '.join(quarantined)}", "W")
+
+
+def get_transcription(images: list,
+                      model: str,
+                      opt_verbose: bool,
+                      workers: int = 1,
+                      **kwargs) -> list:
+    """built from images and an offline recognition model of the text
+    of the separate transcripts for each image.
+
+    Note
+    ----
+    see stream_transcription() for the per-page pipeline
+
     Args:
         images (list): list of user's images
         model (str): relative path to the ML model
         opt_verbose (bool): if user activate verbose option
+        workers (int): number of processes. Defaults to 1 (no pool)
+        **kwargs : pool, model_cache, page_cache_dir or batch_size, see iter_page_records()
 
     Returns:
-        list: list contains the text prediction
+        list: list contains the text prediction (None for a quarantined page)
     """
+    return [None if transcriptions is None else transcriptions[model]
+            for transcriptions in stream_transcription(images, [model], opt_verbose,
+                                                       workers, **kwargs)]
 
-    # STEP 1 : Loading model
-    # Loading the model like kraken.lib.models.TorchSeqRecognizer object
-    # --- Issue : find a way to ignore the output precautionary message
-    model_load = models.load_any(model)
-    # At each new step, a validation message is displayed :
-    report_log(f"\n{'#' * 10} Model loaded \u2713 {'#' * 10}\n", "S")
-
-    # STEP 2 : Loading images
-    # At each new step we create an empty list to receive the new objects, such as :
-    list_image_pil = []
-    pbar = tqdm(images)
-    for img in pbar:
-        pbar.set_description(f'Processing {img} element :')
-        # opening images as PIL objects
-        try:
-            img_pil = Image.open(img)
-            list_image_pil.append(deepcopy(img_pil))
-        except Exception as exception:
-            report_log(f"type : {exception}")
-            report_log(f"Error : unable to load images - {img}", "E")
-            sys.exit('program exit')
 
+def get_transcriptions_models(images: list,
+                              model_list: list,
+                              opt_verbose: bool,
+                              workers: int = 1,
+                              **kwargs) -> dict:
+    """same as get_transcription() with several models : one binarization
+    and segmentation pass is shared by all the models and the text
+    recognition runs per model.
 
-    if opt_verbose:
-        report_log(list_image_pil, "V")
+    Args:
+        images (list): list of user's images
+        model_list (list): relative paths to the ML models
+        opt_verbose (bool): if user activate verbose option
+        workers (int): number of processes. Defaults to 1 (no pool)
+        **kwargs : pool, model_cache, page_cache_dir or batch_size, see iter_page_records()
 
-    # CONTROL STEP 2
-    # At each new step, test if the list created has
-    # received the same number of elements as the previous list :
-    try_control_step(list_image_pil, pbar, "Images loaded")
+    Returns:
+        dict: relative path to the ML model (key) and list contains the text prediction,
+            None for a quarantined page (value)
+    """
+    transcriptions_models = {model: [] for model in model_list}
+    for transcriptions in stream_transcription(images, model_list, opt_verbose, workers, **kwargs):
+        for model in model_list:
+            transcriptions_models[model].append(None if transcriptions is None
+                                                else transcriptions[model])
+    return transcriptions_models
 
-    # STEP 3 : Binarization of images
-    list_img_binarized = []
-    for img_pil in tqdm(list_image_pil, desc='Binarization in progress :'):
-        try:
-            # creates binarized images
-            im_bin = binarization.nlbin(img_pil)
-            list_img_binarized.append(deepcopy(im_bin))
-        except Exception as exception:
-            report_log(f"type : {exception}")
-            report_log(f"Error : unable to binarize - {img_pil}", "E")
-            sys.exit('program exit')
 
-    if opt_verbose:
-        report_log(list_img_binarized, "V")
+def get_quarantined_indexes(*transcriptions_lists: list) -> set:
+    """retrieve the pages quarantined by the OCR pipeline
 
-    # CONTROL STEP 3
-    try_control_step(list_img_binarized, list_image_pil, "Binarization")
+    Args:
+        *transcriptions_lists (list): lists of text predictions (one by model)
 
-    # STEP 4 : Segment images
-    list_img_seg = []
-    for img_bin in tqdm(list_img_binarized, desc='Segmentation in progress :'):
-        # retrieves the coordinates of the segments from the binarized image
-        try:
-            segments_image = pageseg.segment(img_bin, text_direction='horizontal-lr')
-            list_img_seg.append(deepcopy(segments_image))
-        except Exception as exception:
-            report_log(f"type : {exception}")
-            report_log(f"Error : unable to segment - {img_bin}", "E")
-            sys.exit('program exit')
-
-    if opt_verbose:
-        report_log(list_img_seg, "V")
-
-    # CONTROL STEP 4 :
-    try_control_step(list_img_seg, list_img_binarized, "Segmentation")
-
-    # create binarized image-segmented image pairs in order to create text recognition
-    img_bin_seg = get_list_tuple(list_img_binarized, list_img_seg)
-
-    # STEP 5 : Text recognition
-    list_predictions = []
-    counter = 0
-    while len(img_bin_seg) != len(list_predictions):
-        for pair_image_binarized_segments in img_bin_seg:
-            for element in pair_image_binarized_segments:
-                    # extract from the list binarized image-segmented image the
-                    # elements one by one to transform them into an
-                    # kraken.rpred.mm_rpred object content the prediction of the text
-                    # if the counter is even, get binarized image
-                if counter % 2 == 0:
-                    binarize_element = element
-                    counter += 1
-                    # if the counter is odd, get segmented image
-                else:
-                    segment_element = element
-                    # created the text predictions (kraken.rpred.mm_rpred object)
-                    output_rpred = rpred.rpred(model_load,
-                                               binarize_element,
-                                               segment_element,
-                                               bidi_reordering=True)
-                    list_predictions.append(output_rpred)
-                    counter += 1
-
-    if opt_verbose:
-        report_log(list_predictions, "V")
-
-    # STEP 6 : Stores kraken predictions in string format like text transcription
-    list_transcription = []
-    for prediction in tqdm(list_predictions, desc="Transcription in progress :"):
-            # create a canvas to accommodate lines of text
-            # prediction in string format contained in an image
-        canevas = ""
-        try:
-            for line in prediction:
-                # .prediciton is a kraken_ocr_record class attribute for recover the text in
-                # kraken.rpred.mm_rpred object
-                canevas += f"{unicodedata.normalize('NFC', line.prediction)}"
-            list_transcription.append(canevas)
-        except Exception as exception:
-            report_log(f"Error : unable to transcribe - {prediction}", "E")
-            report_log(f"type : {exception}")
-            sys.exit('program exit')
+    Returns:
+        set: indexes of the pages without text prediction
+    """
+    return {index
+            for transcriptions in transcriptions_lists
+            for index, transcription in enumerate(transcriptions)
+            if transcription is None}
 
-    # CONTROL STEP 6
-    try_control_step(list_transcription, list_predictions, "Transcription")
 
-    return list_transcription
+def drop_pages(indexes: set, *lists: list) -> tuple:
+    """remove some pages of lists aligned on the user's images, use it
+    to exclude the quarantined pages before pairing ground truth
+    transcription, prediction and image
+
+    Examples
+    --------
+        >>> drop_pages({1}, ['a', 'b', 'c'], [1, 2, 3], None)
+        (['a', 'c'], [1, 3], None)
+
+    Args:
+        indexes (set): indexes of the pages to remove
+        *lists (list): lists aligned on the images (None is kept as is)
+
+    Returns:
+        tuple: lists without the removed pages
+    """
+    return tuple(None if items is None
+                 else [item for index, item in enumerate(items) if index not in indexes]
+                 for items in lists)
+
+
+def check_pages_left(quarantined: set, images: list) -> None:
+    """report the pages excluded from the metrics and stop
+    the program if no page is left
+
+    Args:
+        quarantined (set): indexes of the quarantined pages
+        images (list): list of user's images left
+    """
+    if quarantined:
+        report_log(f"{len(quarantined)} pages excluded from the metrics, "
+                   f"{len(images)} pages left", "W")
+    if not images:
+        report_log("Error : no page left to evaluate", "E")
+        sys.exit('program exit')
+
+
+def _metrics_record_worker(task: tuple) -> tuple:
+    """creates the metrics object of a page and computes all its
+    metrics (in a worker of the process pool or serially)
+
+    Args:
+        task (tuple): ground truth transcription, prediction, image
+            and clean text option
+
+    Returns:
+        tuple: TranscriptionMetricsRecord of the page and time
+            of the construction in seconds
+    """
+    ground_truth_source, prediction, image, clean_text = task
+    start = time.perf_counter()
+    # creates objects which allow to give the different
+    # metrics for the evaluation of the transcription
+    if clean_text:
+        metrics = TranscriptionMetricsTools(ground_truth_source, prediction, image, clean_text)
+    else:
+        metrics = TranscriptionMetricsTools(ground_truth_source, prediction, image)
+    # only the results go back to the main process, not the tokens
+    record = TranscriptionMetricsRecord.from_metrics(metrics)
+    return record, time.perf_counter() - start
+
+
+def get_metrics(gt_texts: list,
+                transcriptions: list,
+                images: list,
+                clean_text: bool,
+                profile: object = None,
+                workers: int = 1,
+                pool: object = None) -> list:
+    """group ground truth transcription, prediction and image
+    and computes the metrics of each page, in a process pool
+    with workers (chunks of pages by worker)
+
+    Args:
+        gt_texts (list): list of ground truth transcriptions
+        transcriptions (list): list of text predictions
+        images (list): list of user's images
+        clean_text (bool): if user activate clean text option
+        profile (object, optional): RunProfile of the run, the metrics
+            construction of each page is timed
+        workers (int): number of processes. Defaults to 1 (no pool)
+        pool (object, optional): running multiprocessing.Pool to reuse (session mode)
+
+    Returns:
+        list: list contains TranscriptionMetricsRecord objects, in input order
+    """
+    # Grouping ground truth transcription, prediction, and image
+    tasks = [(ground_truth_source, prediction, image, clean_text)
+             for ground_truth_source, prediction, image
+             in get_list_tuple(gt_texts, transcriptions, images)]
+
+    list_statistics = []
+    start_phase = time.perf_counter()
+
+    # a few chunks by worker : less messages than page by page
+    # and the slow pages are still spread over the workers
+    chunksize = max(1, len(tasks) // (workers * 4))
+    pool_run = None
+    if pool is None and workers > 1 and len(tasks) > 1:
+        pool_run = pool = multiprocessing.Pool(min(workers, len(tasks)))
+    try:
+        if pool is not None:
+            # imap keeps the input order of the pages
+            results = pool.imap(_metrics_record_worker, tasks, chunksize)
+        else:
+            results = map(_metrics_record_worker, tasks)
+        for (record, elapsed), task in zip(tqdm(results,
+                                                total=len(tasks),
+                                                desc='metrics objects are being created...'),
+                                           tasks):
+            list_statistics.append(record)
+            if profile is not None:
+                profile.add(task[2], 'Metrics', elapsed)
+    finally:
+        if pool_run is not None:
+            pool_run.close()
+            pool_run.join()
+
+    if profile is not None:
+        profile.add_phase('Metrics', time.perf_counter() - start_phase, len(list_statistics))
+
+    report_log(f"{'#' * 10} Metrics objects created {'#' * 10}\n", "S")
+
+    return list_statistics
+
+
+def report_profile(profile: object, profile_dir: str = None) -> None:
+    """display the throughput and the peak memory of the run
+    and export its profile if user specify a directory
+
+    Args:
+        profile (object): RunProfile of the run
+        profile_dir (str, optional): directory of the profile files
+    """
+    for phase, throughput in profile.throughput().items():
+        report_log(f"{phase} : {throughput['pages']} pages in "
+                   f"{truncate(throughput['wall_time'])} s | "
+                   f"{truncate(throughput['pages_per_second'])} pages/s")
+    peak_rss = profile.to_dict()['peak_rss']
+    report_log(f"peak RSS : {peak_rss['self']} Mo | workers : {peak_rss['children']} Mo")
+    if profile_dir is not None:
+        path_json, path_csv = profile.export(profile_dir)
+        report_log(f"profile exported : {path_json} | {path_csv}", "S")
+
+
+def edit_report(export_dir: str, workers: int, *args, **kwargs) -> None:
+    """serve the HTML report in the web browser or, in headless
+    mode, export it in a static directory
+
+    Args:
+        export_dir (str): directory of the static report, None to serve the report
+        workers (int): number of processes for the export
+        *args, **kwargs: arguments of generate_html_report()
+    """
+    if export_dir is None:
+        generate_html_report(*args, **kwargs)
+        return
+    paths = export_static_report(export_dir, *args, workers=workers, **kwargs)
+    report_log(f"{'#' * 10} Report exported in {export_dir} ({len(paths)} files) "
+               f"\u2713 {'#' * 10}\n", "S")
+
+
+def run_session(default_model: str,
+                opt_verbose: bool,
+                clean_text: bool,
+                workers: int = 1,
+                page_cache_dir: str = None,
+                batch_size: int = None) -> None:
+    """persistent benchmark session : read test set directories on the
+    standard input (one per line) and benchmark each of them. The loaded
+    models are kept in a cache (in each worker if workers > 1) so each
+    model is loaded only once for all the test sets submitted.
+
+    Note
+    ----
+    A test set directory follows the layout of a project (see load_input()),
+    if it does not contain a model the model of the input directory is used.
+
+    Args:
+        default_model (str): relative path to the ML model of the input directory
+        opt_verbose (bool): if user activate verbose option
+        clean_text (bool): if user activate clean text option
+        workers (int): number of processes. Defaults to 1 (no pool)
+        page_cache_dir (str, optional): directory of the page cache
+        batch_size (int, optional): batch size of the text recognition
+    """
+    model_cache = ModelCache(models.load_any)
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers,
+                                    initializer=_init_worker,
+                                    initargs=([], page_cache_dir, batch_size))
+
+    report_log("* Session mode activate : submit a test set directory "
+               "per line (empty line or EOF to quit) *")
+    try:
+        for line in sys.stdin:
+            set_directory = line.strip()
+            if not set_directory:
+                break
+            model_name, model, images, group_gt = load_input(set_directory)
+            if not model:
+                model_name, model = os.path.basename(default_model), default_model
+            report_log(f"* Test set {set_directory} with model {model_name} *")
+
+            transcriptions = get_transcription(images, model, opt_verbose, workers,
+                                               pool=pool,
+                                               model_cache=model_cache,
+                                               page_cache_dir=page_cache_dir,
+                                               batch_size=batch_size)
+            gt_texts = [gt_file.read() for gt_file in build_open_files_set(group_gt)]
+            gt_texts, transcriptions, images = drop_pages(get_quarantined_indexes(transcriptions),
+                                                          gt_texts,
+                                                          transcriptions,
+                                                          images)
+            list_statistics = get_metrics(gt_texts,
+                                          transcriptions,
+                                          images,
+                                          clean_text,
+                                          workers=workers,
+                                          pool=pool)
+            if list_statistics:
+                average_cer = sum(item._calculate_cer_percent()
+                                  for item in list_statistics) / len(list_statistics)
+                average_wer = sum(item._calculate_wer_percent()
+                                  for item in list_statistics) / len(list_statistics)
+                report_log(f"{set_directory} | model : {model_name} | "
+                           f"pages : {len(list_statistics)} | "
+                           f"CER average : {truncate(average_cer)} % | "
+                           f"WER average : {truncate(average_wer)} %", "S")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    if pool is None:
+        report_log(f"models loaded : {model_cache.misses} | "
+                   f"models served from cache : {model_cache.hits}")
+
 
 def main() -> None:
     """launch the cli program.
@@ -282,6 +1078,59 @@ def main() -> None:
                              'replace new line and carriage return with nothing and '
                              'replace the numbers and punctuation with space')
 
+    parser.add_argument('--workers',
+                        '-w',
+                        action='store',
+                        type=int,
+                        default=1,
+                        help='number of processes to transcribe the pages and compute '
+                             'their metrics in parallel (default = 1)')
+
+    parser.add_argument('--session',
+                        '-s',
+                        action='store_true',
+                        help='keep the models loaded and benchmark the test set '
+                             'directories read on the standard input (one per line)')
+
+    parser.add_argument('--page_cache',
+                        '-p',
+                        action='store',
+                        default=None,
+                        help='directory of a cache of the binarized and segmented pages, '
+                             'shared by all the models benchmarked on the same images')
+
+    parser.add_argument('--compare',
+                        action='store_true',
+                        help='compare all the models found in the input directory, '
+                             'the binarization and segmentation are shared by the models')
+
+    parser.add_argument('--run_dir',
+                        '-r',
+                        action='store',
+                        default=None,
+                        help='directory of the run : the page records are written in a journal '
+                             'and a restarted run skips the pages already transcribed')
+
+    parser.add_argument('--profile',
+                        action='store',
+                        default=None,
+                        help='directory where the profile of the run (timings of each stage '
+                             'by page, throughput, peak memory) is exported in JSON and CSV')
+
+    parser.add_argument('--export',
+                        '-e',
+                        action='store',
+                        default=None,
+                        help='headless mode : render the report (pages and figures) in the '
+                             'static directory EXPORT instead of serving it, without any prompt')
+
+    parser.add_argument('--batch_size',
+                        '-b',
+                        action='store',
+                        type=int,
+                        default=None,
+                        help='recognize the lines in batches of BATCH_SIZE lines '
+                             'collected across pages (default = line by line)')
 
     # ---- Config variables
     # ---- ...generated with Argparse
@@ -289,6 +1138,14 @@ def main() -> None:
     opt_verbose = vars(args)['verbosity']  # Print a series of execution messages
     label = vars(args)['label']            # Attach a description to user's images
     clean_text = vars(args)['clean_text']  # Performs few clean steps on text
+    workers = max(1, vars(args)['workers'])  # Number of processes for the OCR and metrics
+    session = vars(args)['session']        # Benchmark several test sets with models cached
+    page_cache_dir = vars(args)['page_cache']  # Cache of the binarized and segmented pages
+    compare = vars(args)['compare']        # Compare several models in one run
+    batch_size = vars(args)['batch_size']  # Batched text recognition across pages
+    run_dir = vars(args)['run_dir']        # Journal of the run, to resume it
+    profile_dir = vars(args)['profile']    # Export of the timings of the run
+    export_dir = vars(args)['export']      # Headless static report
 
     # ---- ...others
     if vars(args)['input'] != '.':
@@ -305,45 +1162,92 @@ def main() -> None:
         report_log('* Label mode activate *')
     if clean_text:
         report_log('* Clean text mode activate *')
-    time.sleep(5)
+    if export_dir is None:
+        time.sleep(5)
+    else:
+        report_log(f'* Headless mode activate : report exported in {export_dir} *')
+
+    if session:
+        run_session(model, opt_verbose, clean_text, workers, page_cache_dir, batch_size)
+        return
 
     if label:
         metadata = get_metadata(images)
     else:
         metadata = None
 
+    journal = None
+    if run_dir is not None:
+        journal = RunJournal(run_dir)
+        report_log(f"* Run journal : {journal.path} *")
+    profile = RunProfile()
+
     # Build a list contains open & read IO.Wrapper files
     gt_set = build_open_files_set(group_gt)
+    gt_texts = [gt_file.read() for gt_file in gt_set]
+
+    if compare:
+        model_list = load_models(vars(args)['input'])
+        report_log(f"* Comparison mode activate : {len(model_list)} models *")
+
+        # ---- RUN 1 : OCR sequence start, shared by all the models
+        transcriptions_models = get_transcriptions_models(images, model_list, opt_verbose, workers,
+                                                          journal=journal,
+                                                          profile=profile,
+                                                          page_cache_dir=page_cache_dir,
+                                                          batch_size=batch_size)
+
+        # ---- quarantined pages are excluded from the comparison
+        quarantined = get_quarantined_indexes(*transcriptions_models.values())
+        gt_texts, images, metadata, *transcriptions_lists = drop_pages(quarantined,
+                                                                       gt_texts,
+                                                                       images,
+                                                                       metadata,
+                                                                       *transcriptions_models.values())
+        transcriptions_models = dict(zip(transcriptions_models, transcriptions_lists))
+        check_pages_left(quarantined, images)
+
+        # ---- RUN 2 & 3 : Metrics Object creation sequence start for each model
+        comparison = {os.path.basename(model_path): get_metrics(gt_texts,
+                                                                transcriptions,
+                                                                images,
+                                                                clean_text,
+                                                                profile,
+                                                                workers)
+                      for model_path, transcriptions in transcriptions_models.items()}
+        report_profile(profile, profile_dir)
+
+        # ---- RUN 4 : Edit report sequence start, the first model is detailed
+        model_name = next(iter(comparison))
+        edit_report(export_dir, workers, metadata, model_name, comparison[model_name], images,
+                    comparison=comparison,
+                    profile=profile.to_dict())
+        return
 
     # ---- RUN 1 : OCR sequence start
-    transcriptions = get_transcription(images, model, opt_verbose)
-
-    # ---- RUN 2 : Grouping ground truth transcription, prediction, and image
-    group_gt_model_list = get_list_tuple(gt_set, transcriptions, images)
-
-    # ---- RUN 3 : Metrics Object creation sequence start
-    list_statistics = []
-
-    for ground_truth_source, prediction, image in tqdm(group_gt_model_list,
-                                                       desc='metrics objects are being created...'):
-        # creates objects which allow to give the different
-        # metrics for the evaluation of the transcription
-        if clean_text:
-            list_statistics.append(TranscriptionMetricsTools(ground_truth_source.read(),
-                                                             prediction,
-                                                             image,
-                                                             clean_text)
-                                   )
-        else:
-            list_statistics.append(TranscriptionMetricsTools(ground_truth_source.read(),
-                                                             prediction,
-                                                             image)
-                                   )
-
-    report_log(f"{'#' * 10} Metrics objects created {'#' * 10}\n", "S")
+    transcriptions = get_transcription(images, model, opt_verbose, workers,
+                                       journal=journal,
+                                       profile=profile,
+                                       page_cache_dir=page_cache_dir,
+                                       batch_size=batch_size)
+
+    # ---- quarantined pages are excluded from the metrics
+    quarantined = get_quarantined_indexes(transcriptions)
+    gt_texts, images, metadata, transcriptions = drop_pages(quarantined,
+                                                            gt_texts,
+                                                            images,
+                                                            metadata,
+                                                            transcriptions)
+    check_pages_left(quarantined, images)
+
+    # ---- RUN 2 & 3 : Grouping ground truth transcription, prediction, and image
+    # ---- and Metrics Object creation sequence start
+    list_statistics = get_metrics(gt_texts, transcriptions, images, clean_text, profile, workers)
+    report_profile(profile, profile_dir)
 
     # ---- RUN 4 : Edit report sequence start
-    generate_html_report(metadata, model_name, list_statistics, images)
+    edit_report(export_dir, workers, metadata, model_name, list_statistics, images,
+                profile=profile.to_dict())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,11 @@
+"""pytest configuration : the tests import the modules of the KB-app
+directory as kraken_benchmark.py does (run them from KB-app)
+
+    $ python -m pytest tests
+"""
+
+# built-in packages
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
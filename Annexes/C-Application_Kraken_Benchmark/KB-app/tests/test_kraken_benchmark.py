@@ -0,0 +1,56 @@
+"""tests of the batched text recognition of the OCR pipeline (kraken_benchmark)"""
+
+# external packages
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("kraken")
+
+# local packages
+from kraken_benchmark import _predict_batches, supports_batched_prediction  # noqa: E402
+
+
+class BatchedModel:
+    """stub of a recognizer with the batched predict_string(line, lens) :
+    the prediction of a line is its width, the batches are recorded"""
+
+    def __init__(self) -> None:
+        self.batches = []
+
+    def predict_string(self, line, lens=None):
+        self.batches.append((tuple(line.shape), lens.tolist()))
+        return [str(length) for length in lens.tolist()]
+
+
+class LineModel:
+    """stub of a recognizer of the older kraken releases (one line at a time)"""
+
+    def predict_string(self, line):
+        return ""
+
+
+def test_supports_batched_prediction():
+    assert supports_batched_prediction({'batched.mlmodel': BatchedModel()})
+    assert not supports_batched_prediction({'line.mlmodel': LineModel()})
+    assert not supports_batched_prediction({'batched.mlmodel': BatchedModel(),
+                                            'line.mlmodel': LineModel()})
+    assert not supports_batched_prediction({'other.mlmodel': object()})
+
+
+def test_predict_batches_input_order():
+    """lines of different widths and heights, empty lines : the predictions
+    come back in input order, the batches hold lines of the same height"""
+    widths = [30, 10, None, 50, 20, 40]
+    heights = [48, 48, None, 48, 32, 48]
+    lines = [None if width is None else torch.ones(1, height, width)
+             for width, height in zip(widths, heights)]
+    model = BatchedModel()
+
+    predictions = _predict_batches(model, lines, batch_size=2)
+
+    assert predictions == ['30', '10', '', '50', '20', '40']
+    for shape, lens in model.batches:
+        assert len(lens) <= 2
+        assert shape[0] == len(lens) and shape[-1] == max(lens)
+    # one batch for the line of height 32, two for the lines of height 48
+    assert sorted(shape[2] for shape, _ in model.batches) == [32, 48, 48]
@@ -0,0 +1,79 @@
+"""tests of the static export of the report (kb_report.routing)"""
+
+# local packages
+from kb_report.routing import DEFAULT_SIGNALS_PARAMS, IMAGE_URLS, get_report_urls
+
+
+def test_report_urls_one_chunk_by_image():
+    """the export pool maps the URLs by chunks of len(IMAGE_URLS) : each
+    chunk must hold all the URLs of one image and only them"""
+    size_images = 5
+    urls = get_report_urls(size_images)
+    chunks = [urls[start:start + len(IMAGE_URLS)]
+              for start in range(0, len(urls), len(IMAGE_URLS))]
+    signals_params = "-".join(str(DEFAULT_SIGNALS_PARAMS[param])
+                              for param in ('min_interval', 'max_interval',
+                                            'show_deltas', 'error_boxes'))
+    for number in range(size_images):
+        assert chunks[number] == [url.format(number=number, signals_params=signals_params)
+                                  for url in IMAGE_URLS]
+    # the pages of the whole report are exported once, after the images
+    assert chunks[size_images:] == [["/", "/KB-notebook"]]
+
+
+def test_report_urls_without_image():
+    assert get_report_urls(0) == ["/", "/KB-notebook"]
+
+
+def make_client(monkeypatch, routing, cache_size: int, rendered: list):
+    """test client of a report of one page, the signals figures are
+    replaced by empty figures and their intervals recorded in rendered"""
+    from matplotlib.figure import Figure
+
+    from STS_Tools.SynSemTS import TranscriptionMetricsRecord
+
+    def plot_signal_window(window, **options):
+        rendered.append((window.sample_b, window.sample_e))
+        return Figure(figsize=(1, 1))
+
+    monkeypatch.setattr(routing, "arrange_images_in_static", lambda images: None)
+    monkeypatch.setattr(routing, "plot_signal_window", plot_signal_window)
+    monkeypatch.setattr(routing, "PNG_CACHE_SIZE", cache_size)
+    record = TranscriptionMetricsRecord(source="Oh le beau bateau", prediction="Oh le belle avion",
+                                        image="page.png", name_image="page.png", canevas_image="",
+                                        distance_int_char=7, distance_int_word=2,
+                                        reference_total_char=17, reference_total_word=4,
+                                        edit_distance_levensthein=7, hamming_distance=7,
+                                        jaccard_similarity=0.33, cosine_similarity=0.5)
+    return routing.create_app(None, "model", [record], [], "user").test_client()
+
+
+def test_png_cache_keeps_the_recent_figures(monkeypatch):
+    """the figures of the report are kept in a bounded cache : the least
+    recently used one is rendered again"""
+    from kb_report import routing
+
+    rendered = []
+    client = make_client(monkeypatch, routing, 2, rendered)
+
+    for interval in ("0-5", "5-10", "0-5", "10-15", "5-10", "0-5"):
+        assert client.get(f"/sequences-signals-0-{interval}-0-1.png").status_code == 200
+    # 0-5 and 5-10 cached, 10-15 drops 5-10 (least recently used), 5-10 drops 0-5
+    assert rendered == [(0, 5), (5, 10), (10, 15), (5, 10), (0, 5)]
+
+
+def test_png_cache_concurrent_requests(monkeypatch):
+    """the threaded server requests the figures of a page at once : the
+    evictions of the other threads never break a request"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from kb_report import routing
+
+    client = make_client(monkeypatch, routing, 1, [])
+    urls = [f"/sequences-signals-0-{start}-{start + 5}-0-1.png"
+            for start in range(0, 15, 5)] * 20
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(client.get, urls))
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.data.startswith(b"\x89PNG") for response in responses)
@@ -0,0 +1,37 @@
+"""tests of the characters confusion matrix (STS_Tools.STSConfusion)"""
+
+# local packages
+from STS_Tools.STSConfusion import ConfusionAccumulator
+
+
+def test_top_k_ties_at_the_boundary():
+    """confusions with the same occurences : the first ones by index
+    of the reference then of the predicted character are kept"""
+    confusion = ConfusionAccumulator()
+    confusion.add("abcd", "wxyz")
+    assert confusion.characters() == ['ε', 'a', 'b', 'c', 'd', 'w', 'x', 'y', 'z']
+    assert confusion.top_k(2) == [(('replace', 'a', 'w'), 1), (('replace', 'b', 'x'), 1)]
+    assert confusion.top_k(4) == confusion.top_k(10)
+
+
+def test_top_k_decreasing_occurences():
+    confusion = ConfusionAccumulator()
+    confusion.add("chat chat", "chut chut")
+    confusion.add("la", "l")
+    assert confusion.top_k(2) == [(('replace', 'a', 'u'), 2), (('delete', 'a', 'ε'), 1)]
+
+
+def test_top_k_literal_epsilon():
+    """a real ε of the texts is a character like the others, not the
+    placeholder of the insertions and deletions"""
+    confusion = ConfusionAccumulator()
+    confusion.add("aεb", "ab")
+    assert confusion.top_k() == [(('delete', 'ε', 'ε'), 1)]
+
+    confusion = ConfusionAccumulator()
+    confusion.add("axb", "aεb")
+    assert confusion.top_k() == [(('replace', 'x', 'ε'), 1)]
+
+    confusion = ConfusionAccumulator()
+    confusion.add("ab", "aεb")
+    assert confusion.top_k() == [(('insert', 'ε', 'ε'), 1)]
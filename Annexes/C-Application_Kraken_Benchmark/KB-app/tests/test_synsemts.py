@@ -0,0 +1,45 @@
+"""tests of the metrics of a page (STS_Tools.SynSemTS)"""
+
+# built-in packages
+from collections import Counter
+
+# external packages
+from Levenshtein import editops
+import pytest
+
+# local packages
+from STS_Tools.SynSemTS import TranscriptionMetricsRecord, TranscriptionMetricsTools, VisualSynTS
+
+
+@pytest.mark.parametrize("source, prediction", [
+    ("", ""),
+    # stop words only, nothing left after their removal
+    ("le la les", "de la"),
+])
+def test_jaccard_similarity_without_words(source, prediction):
+    """no ZeroDivisionError on an empty union of words : the record of
+    the page is built in a worker of the metrics stage"""
+    metrics = TranscriptionMetricsTools(source, prediction, "page.png")
+    assert metrics.jaccard_similarity == 1.0
+    record = TranscriptionMetricsRecord.from_metrics(metrics)
+    assert record.get_jaccard_similarity() == 1.0
+    assert record.get_cosine_sim() == 0.0
+
+
+def test_jaccard_similarity_one_empty_text():
+    metrics = TranscriptionMetricsTools("Un homme à la mer", "", "page.png")
+    assert metrics.jaccard_similarity == 0.0
+
+
+def test_pair_char_errors_literal_epsilon():
+    """a real ε of the page deleted by the prediction is a deletion, as
+    counted from the editops() operations"""
+    source, prediction = "Soit ε un réel", "Soit un rél ε"
+    expected = Counter((operation,
+                        'ε' if operation == 'insert' else source[spos],
+                        'ε' if operation == 'delete' else prediction[dpos])
+                       for operation, spos, dpos in editops(source, prediction))
+    pairs = VisualSynTS(source, prediction).pair_char_errors_max_occurences
+    assert Counter(dict(pairs)) == expected
+    assert (('delete', 'ε', 'ε'), 1) in pairs
+    assert (('replace', 'l', 'ε'), 1) in pairs